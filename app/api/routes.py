@@ -1,13 +1,27 @@
 """FastAPI routes for OCR pipeline."""
+import base64
+import binascii
+import os
+import shutil
+import tempfile
+import time
+
+import orjson
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import and_, bindparam, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from typing import List, Optional
 from datetime import datetime
 import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import aiofiles
 
-from app.database.db import get_db, init_db
-from app.database.models import Document, ProcessingJob, ExtractedContent, FailureLog
+from app.database.db import get_db
+from app.database.models import Document, ProcessingJob, ExtractedContent
 from app.api.schemas import (
     UploadResponse,
     JobStatusResponse,
@@ -18,9 +32,11 @@ from app.api.schemas import (
     FailureListResponse,
     FailureLogResponse
 )
+from app.services.cache import get_document_cached
+from app.services.failure_logger import FailureLogger
 from app.services.storage import storage_service
 from app.services.document_processor import DocumentProcessor
-from app.crew.pipeline import OCRPipeline
+from app.crew.pipeline import get_shared_pipeline
 from app.config import settings
 from app.utils.logger import get_logger
 
@@ -28,55 +44,187 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api", tags=["ocr"])
 
-# Initialize database on startup
-init_db()
-
 # Initialize services
 document_processor = DocumentProcessor()
-pipeline = OCRPipeline()
+failure_logger = FailureLogger()
+pipeline = get_shared_pipeline()
+
+# Chunk size for streaming uploads to disk (1MB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bounded worker pool for background document processing
+PROCESS_POOL = ThreadPoolExecutor(
+    max_workers=settings.max_concurrent_jobs,
+    thread_name_prefix="OCR"
+)
+
+# One dedicated event loop shared by every background job, so pipeline
+# coroutines reuse the same connection pools instead of paying loop
+# setup/teardown per document
+_BG_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_BG_LOOP.run_forever, daemon=True, name="OCR-loop").start()
+
+
+# Module-level statements for the hot lookups: the compiled SQL text is
+# identical across calls, so SQLAlchemy's statement cache always hits
+_JOB_BY_ID = select(ProcessingJob).where(ProcessingJob.id == bindparam("job_id"))
+_CONTENT_BY_DOCUMENT = select(ExtractedContent).where(
+    ExtractedContent.document_id == bindparam("document_id")
+)
+
+# Short-TTL cache for the /history total so every page doesn't re-count
+_HISTORY_TOTAL_TTL = 5.0  # seconds
+_history_total_cache = {"total": 0, "expires": 0.0}
+
+
+def _encode_cursor(upload_date: datetime, document_id: int) -> str:
+    """Encode a (upload_date, id) keyset position as an opaque cursor."""
+    raw = f"{upload_date.isoformat()}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor back into (upload_date, id); 400 on garbage input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_str, _, document_id = raw.rpartition("|")
+        return datetime.fromisoformat(date_str), int(document_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _run_job(document_id: int, job_id: int):
+    """Run the processing pipeline for one job on a pool worker thread."""
+    from app.database.db import SessionLocal
+    background_db = SessionLocal()
+    try:
+        logger.info("Starting background processing for document %s, job %s", document_id, job_id)
+        future = asyncio.run_coroutine_threadsafe(
+            pipeline.process_document(background_db, document_id, job_id),
+            _BG_LOOP
+        )
+        future.result()
+        logger.info("Background processing completed for document %s, job %s", document_id, job_id)
+    except Exception as e:
+        logger.exception("Background processing task failed for document %s, job %s: %s", document_id, job_id, e)
+        # Mark job as failed
+        try:
+            job = background_db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+            if job:
+                job.status = "failed"
+                job.error_message = str(e)
+                job.completed_at = func.now()  # DB-side timestamp, one clock source
+                background_db.commit()
+        except Exception as db_err:
+            logger.error("Failed to update job status: %s", db_err)
+    finally:
+        background_db.close()
+
+
+def _copy_spooled_to_disk(src, file_path: str, size: int):
+    """Copy an already-spooled upload to its destination.
+
+    Uses in-kernel os.sendfile when the spool has rolled to a real file
+    (no user-space buffers at all), shutil.copyfileobj otherwise.
+    """
+    src.seek(0)
+    with open(file_path, "wb") as out:
+        if getattr(src, "_rolled", False):
+            # sendfile may transfer fewer bytes than asked; loop until
+            # the whole spool has been copied
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    raise IOError(f"sendfile copied only {offset} of {size} bytes to {file_path}")
+                offset += sent
+        else:
+            shutil.copyfileobj(src, out, length=UPLOAD_CHUNK_SIZE)
+
+
+async def _stream_upload_to_disk(file: UploadFile, file_path: str) -> tuple:
+    """Write an uploaded file to disk with bounded memory.
+
+    When the multipart parser has already spooled the upload, the size is
+    known upfront and the copy happens in one zero-copy/buffered pass off
+    the event loop. Otherwise the file is streamed in fixed-size chunks
+    with the size limit enforced while bytes are still arriving.
+
+    Returns:
+        Tuple of (total bytes written, first bytes of the file for
+        magic-number format detection).
+    """
+    src = getattr(file, "file", None)
+    if isinstance(src, tempfile.SpooledTemporaryFile):
+        size = src.seek(0, os.SEEK_END)
+        if size > settings.max_upload_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large - maximum size is {settings.max_upload_size // (1024 * 1024)}MB"
+            )
+        src.seek(0)
+        header = src.read(16)
+        await asyncio.to_thread(_copy_spooled_to_disk, src, file_path, size)
+        return size, header
+
+    total = 0
+    header = b""
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            if not header:
+                header = chunk[:16]
+            total += len(chunk)
+            if total > settings.max_upload_size:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large - maximum size is {settings.max_upload_size // (1024 * 1024)}MB"
+                )
+            await f.write(chunk)
+    return total, header
 
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_document(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload a document for OCR processing."""
     document_id = None
     job_id = None
     
     try:
-        logger.info(f"Received upload request for file: {file.filename}")
+        logger.info("Received upload request for file: %s", file.filename)
         
-        # Read file content with timeout protection
+        # Stream file to disk in chunks with timeout protection
+        file_path = str(storage_service.get_upload_path(file.filename))
         try:
-            content = await asyncio.wait_for(file.read(), timeout=60.0)  # 60 second timeout for large files
+            file_size, header = await asyncio.wait_for(
+                _stream_upload_to_disk(file, file_path),
+                timeout=60.0  # 60 second timeout for large files
+            )
+            logger.debug("File saved to: %s", file_path)
         except asyncio.TimeoutError:
+            storage_service.delete_file(file_path)
             raise HTTPException(status_code=408, detail="File upload timeout - file too large or connection too slow")
-
-        # Check file size (100MB limit)
-        if len(content) > 100 * 1024 * 1024:
-            raise HTTPException(status_code=413, detail="File too large - maximum size is 100MB")
-        
-        logger.debug(f"File size: {len(content)} bytes")
-        
-        # Save file (synchronous, fast)
-        try:
-            file_path = storage_service.save_upload(content, file.filename)
-            logger.debug(f"File saved to: {file_path}")
+        except HTTPException:
+            # Size limit exceeded mid-stream - clean up the partial file
+            storage_service.delete_file(file_path)
+            raise
         except Exception as e:
-            logger.error(f"Failed to save file: {e}")
+            logger.error("Failed to save file: %s", e)
+            storage_service.delete_file(file_path)
             raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-        
+
+        logger.debug("File size: %d bytes", file_size)
+
         # Detect file type (synchronous, fast)
         try:
-            file_type, mime_type = document_processor.detect_format(file_path)
-            file_size = document_processor.get_file_size(file_path)
+            file_type, mime_type = document_processor.detect_format(file_path, header=header)
         except Exception as e:
-            logger.error(f"Failed to detect file format: {e}")
+            logger.error("Failed to detect file format: %s", e)
             raise HTTPException(status_code=400, detail=f"Unsupported file format: {str(e)}")
         
-        # Create document record (synchronous, fast)
+        # Create document + job records in one transaction (one flush, one fsync)
         try:
             document = Document(
                 filename=file.filename,
@@ -85,30 +233,16 @@ async def upload_document(
                 file_size=file_size,
                 status="pending"
             )
-            db.add(document)
-            db.commit()
-            db.refresh(document)
+            job = ProcessingJob(document=document, status="pending")
+            db.add_all([document, job])
+            await db.flush()  # Populates both ids via the relationship
             document_id = document.id
-            logger.info(f"Document created: ID {document_id}")
-        except Exception as e:
-            logger.error(f"Failed to create document record: {e}")
-            db.rollback()
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-        
-        # Create processing job (synchronous, fast)
-        try:
-            job = ProcessingJob(
-                document_id=document_id,
-                status="pending"
-            )
-            db.add(job)
-            db.commit()
-            db.refresh(job)
             job_id = job.id
-            logger.info(f"Job created: ID {job_id}")
+            await db.commit()
+            logger.info("Document created: ID %s, job created: ID %s", document_id, job_id)
         except Exception as e:
-            logger.error(f"Failed to create job record: {e}")
-            db.rollback()
+            logger.error("Failed to create document/job records: %s", e)
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
         
         # Prepare response BEFORE starting background processing
@@ -120,46 +254,10 @@ async def upload_document(
             message="Document uploaded successfully. Processing started."
         )
         
-        # Start processing in background thread (AFTER preparing response)
-        def process_in_background():
-            from app.database.db import SessionLocal
-            import asyncio
-            background_db = SessionLocal()
-            try:
-                # Create new event loop for this thread
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                try:
-                    logger.info(f"Starting background processing for document {document_id}, job {job_id}")
-                    # Run the async pipeline
-                    loop.run_until_complete(
-                        pipeline.process_document(background_db, document_id, job_id)
-                    )
-                    logger.info(f"Background processing completed for document {document_id}, job {job_id}")
-                finally:
-                    # Clean up event loop
-                    loop.close()
-            except Exception as e:
-                logger.exception(f"Background processing task failed for document {document_id}, job {job_id}: {e}")
-                # Mark job as failed
-                try:
-                    job = background_db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
-                    if job:
-                        job.status = "failed"
-                        job.error_message = str(e)
-                        job.completed_at = datetime.utcnow()
-                        background_db.commit()
-                except Exception as db_err:
-                    logger.error(f"Failed to update job status: {db_err}")
-            finally:
-                background_db.close()
-        
-        # Start background thread (non-daemon so it doesn't get killed on reload)
-        thread = threading.Thread(target=process_in_background, daemon=False, name=f"OCR-Processing-{job_id}")
-        thread.start()
-        logger.info(f"Background thread started for document {document_id}, job {job_id}")
-        
+        # Submit to the bounded worker pool (AFTER preparing response)
+        PROCESS_POOL.submit(_run_job, document_id, job_id)
+        logger.info("Background job submitted for document %s, job %s", document_id, job_id)
+
         # Return response immediately (processing happens in background)
         return response_data
         
@@ -167,64 +265,51 @@ async def upload_document(
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.exception(f"Upload failed: {e}")
+        logger.exception("Upload failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
 @router.get("/status/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(
     job_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get processing job status."""
     try:
-        job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+        result = await db.execute(_JOB_BY_ID, {"job_id": job_id})
+        job = result.scalar_one_or_none()
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        return JobStatusResponse(
-            job_id=job.id,
-            document_id=job.document_id,
-            status=job.status,
-            current_stage=job.current_stage,
-            retry_count=job.retry_count,
-            created_at=job.created_at,
-            started_at=job.started_at,
-            completed_at=job.completed_at,
-            error_message=job.error_message
-        )
+        # Validate straight from the ORM row (pydantic-core fast path)
+        return JobStatusResponse.model_validate(job)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching job status: {e}")
+        logger.error("Error fetching job status: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch job status")
 
 
 @router.get("/document/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get document with extracted content."""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    # Document fields come from the TTL snapshot cache; polling clients
+    # re-fetching the same document skip the row lookup entirely. Misses
+    # open a short-lived sync session, so keep them off the event loop.
+    document = await asyncio.to_thread(get_document_cached, document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    
-    extracted_content = db.query(ExtractedContent).filter(
-        ExtractedContent.document_id == document_id
-    ).first()
+
+    result = await db.execute(_CONTENT_BY_DOCUMENT, {"document_id": document_id})
+    extracted_content = result.scalars().first()
     
     extracted_content_response = None
     if extracted_content:
-        extracted_content_response = ExtractedContentResponse(
-            id=extracted_content.id,
-            raw_text=extracted_content.raw_text,
-            summary=extracted_content.summary,
-            confidence_score=extracted_content.confidence_score,
-            metadata=extracted_content.extraction_metadata,
-            created_at=extracted_content.created_at
-        )
-    
+        extracted_content_response = ExtractedContentResponse.model_validate(extracted_content)
+
     return DocumentResponse(
         document_id=document.id,
         filename=document.filename,
@@ -235,71 +320,110 @@ async def get_document(
     )
 
 
-@router.get("/history", response_model=HistoryResponse)
+@router.get("/history", response_model=HistoryResponse, response_class=ORJSONResponse)
 async def get_history(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get processing history."""
-    # Query documents with their jobs and extracted content, ordered by upload_date (newest first)
-    documents = db.query(Document).order_by(Document.upload_date.desc()).offset(skip).limit(limit).all()
-    
-    items = []
-    for doc in documents:
-        # Get latest job
-        job = db.query(ProcessingJob).filter(
-            ProcessingJob.document_id == doc.id
-        ).order_by(ProcessingJob.created_at.desc()).first()
-        
-        # Get extracted content for confidence score and summary
-        extracted = db.query(ExtractedContent).filter(
-            ExtractedContent.document_id == doc.id
-        ).first()
-        
-        items.append(HistoryItemResponse(
-            document_id=doc.id,
-            job_id=job.id if job else 0,
-            filename=doc.filename,
-            status=doc.status,
-            current_stage=job.current_stage if job else None,
-            confidence_score=extracted.confidence_score if extracted else None,
-            summary=extracted.summary if extracted else None,
-            upload_date=doc.upload_date,
-            completed_at=job.completed_at if job else None
+    """Get processing history.
+
+    Pagination is keyset-based on (upload_date, id): pass back the
+    `next_cursor` from the previous page. `skip` is still honored for
+    cursor-less calls.
+    """
+    # Single round-trip: outer-join each document with its latest job (via a
+    # row_number window) and its extracted content, instead of 2N+2 queries
+    latest_job_sq = (
+        select(
+            ProcessingJob,
+            func.row_number().over(
+                partition_by=ProcessingJob.document_id,
+                order_by=ProcessingJob.created_at.desc()
+            ).label("rn")
+        ).subquery()
+    )
+    latest_job = aliased(ProcessingJob, latest_job_sq)
+
+    stmt = (
+        select(Document, latest_job, ExtractedContent)
+        .outerjoin(latest_job, and_(
+            latest_job_sq.c.document_id == Document.id,
+            latest_job_sq.c.rn == 1
         ))
-    
-    total = db.query(Document).count()
-    
-    return HistoryResponse(items=items, total=total)
+        .outerjoin(ExtractedContent, ExtractedContent.document_id == Document.id)
+        .order_by(Document.upload_date.desc(), Document.id.desc())
+    )
+
+    if cursor:
+        # Keyset pagination: O(limit) regardless of page depth
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Document.upload_date, Document.id) < (cursor_date, cursor_id))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    # Total changes rarely relative to how often history is polled; cache it
+    now = time.monotonic()
+    if now >= _history_total_cache["expires"]:
+        _history_total_cache["total"] = (
+            await db.execute(select(func.count()).select_from(Document))
+        ).scalar_one()
+        _history_total_cache["expires"] = now + _HISTORY_TOTAL_TTL
+    total = _history_total_cache["total"]
+
+    # Stream rows straight from a server-side cursor so memory stays O(row)
+    # and the client sees the first items before the page is fully fetched
+    async def generate():
+        yield b'{"items":['
+        first = True
+        count = 0
+        last_key = None
+        has_more = False
+
+        result = await db.stream(stmt.limit(limit + 1))
+        async for doc, job, extracted in result:
+            if count == limit:
+                has_more = True
+                break
+            payload = orjson.dumps(_history_item(doc, job, extracted))
+            yield payload if first else b"," + payload
+            first = False
+            last_key = (doc.upload_date, doc.id)
+            count += 1
+
+        next_cursor = _encode_cursor(*last_key) if has_more and last_key else None
+        yield b'],"total":' + str(total).encode()
+        yield b',"next_cursor":' + orjson.dumps(next_cursor) + b'}'
 
+    return StreamingResponse(generate(), media_type="application/json")
 
-@router.get("/failures", response_model=FailureListResponse)
+
+def _history_item(doc, job, extracted) -> dict:
+    """Build one history item dict from a joined (doc, job, extracted) row."""
+    return {
+        "document_id": doc.id,
+        "job_id": job.id if job else 0,
+        "filename": doc.filename,
+        "status": doc.status,
+        "current_stage": job.current_stage if job else None,
+        "confidence_score": extracted.confidence_score if extracted else None,
+        "summary": extracted.summary if extracted else None,
+        "upload_date": doc.upload_date,
+        "completed_at": job.completed_at if job else None
+    }
+
+
+@router.get("/failures", response_model=FailureListResponse, response_class=ORJSONResponse)
 async def get_failures(
     reviewed: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get failure logs for human review."""
-    from app.services.failure_logger import FailureLogger
-    failure_logger = FailureLogger()
-    
-    failures = failure_logger.get_failures(db, reviewed=reviewed, limit=limit)
-    
-    items = [
-        FailureLogResponse(
-            id=f.id,
-            job_id=f.job_id,
-            document_id=f.document_id,
-            error_message=f.error_message,
-            error_type=f.error_type,
-            retry_count=f.retry_count,
-            created_at=f.created_at,
-            reviewed=f.reviewed,
-            review_notes=f.review_notes
-        )
-        for f in failures
-    ]
-    
+    failures = await failure_logger.get_failures_async(db, reviewed=reviewed, limit=limit)
+
+    items = [FailureLogResponse.model_validate(f) for f in failures]
+
     return FailureListResponse(items=items, total=len(items))
 
@@ -1,11 +1,13 @@
 """Pydantic models for API request/response."""
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 
 
 class UploadResponse(BaseModel):
     """Response model for document upload."""
+    model_config = ConfigDict(frozen=True)
+
     document_id: int
     job_id: int
     filename: str
@@ -15,7 +17,9 @@ class UploadResponse(BaseModel):
 
 class JobStatusResponse(BaseModel):
     """Response model for job status."""
-    job_id: int
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True, frozen=True)
+
+    job_id: int = Field(validation_alias=AliasChoices("job_id", "id"))
     document_id: int
     status: str
     current_stage: Optional[str] = None  # preprocessing, ocr_extraction, summarization, saving_results, failed
@@ -26,28 +30,39 @@ class JobStatusResponse(BaseModel):
     error_message: Optional[str] = None
 
 
-class DocumentResponse(BaseModel):
-    """Response model for document retrieval."""
-    document_id: int
-    filename: str
-    file_type: str
-    status: str
-    upload_date: datetime
-    extracted_content: Optional['ExtractedContentResponse'] = None
-
-
 class ExtractedContentResponse(BaseModel):
     """Response model for extracted content."""
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True, frozen=True)
+
     id: int
     raw_text: str
     summary: Optional[str] = None
     confidence_score: Optional[float] = None
-    metadata: Optional[str] = None
+    # Validate only from the ORM column name: every declarative instance
+    # also exposes `.metadata` (SQLAlchemy's MetaData registry), which an
+    # alias choice on "metadata" would pick up first and choke on.
+    # Serialization still uses the field name, so the JSON key stays
+    # "metadata".
+    metadata: Optional[dict] = Field(None, validation_alias="extraction_metadata")
     created_at: datetime
 
 
+class DocumentResponse(BaseModel):
+    """Response model for document retrieval."""
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True, frozen=True)
+
+    document_id: int = Field(validation_alias=AliasChoices("document_id", "id"))
+    filename: str
+    file_type: str
+    status: str
+    upload_date: datetime
+    extracted_content: Optional[ExtractedContentResponse] = None
+
+
 class HistoryItemResponse(BaseModel):
     """Response model for history item."""
+    model_config = ConfigDict(frozen=True)
+
     document_id: int
     job_id: int
     filename: str
@@ -61,12 +76,17 @@ class HistoryItemResponse(BaseModel):
 
 class HistoryResponse(BaseModel):
     """Response model for history list."""
+    model_config = ConfigDict(frozen=True)
+
     items: List[HistoryItemResponse]
     total: int
+    next_cursor: Optional[str] = None  # Keyset cursor for the next page
 
 
 class FailureLogResponse(BaseModel):
     """Response model for failure log."""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     job_id: int
     document_id: int
@@ -80,11 +100,7 @@ class FailureLogResponse(BaseModel):
 
 class FailureListResponse(BaseModel):
     """Response model for failure list."""
+    model_config = ConfigDict(frozen=True)
+
     items: List[FailureLogResponse]
     total: int
-
-
-# Update forward references
-DocumentResponse.model_rebuild()
-ExtractedContentResponse.model_rebuild()
-
@@ -15,15 +15,35 @@ class Settings(BaseSettings):
     # Use absolute path to ensure database is created in project root
     _db_path = Path(__file__).parent.parent / "ocr_pipeline.db"
     database_url: str = f"sqlite:///{_db_path.absolute()}"
+
+    # Connection pool sizing - keep pool_size + max_overflow above
+    # max_concurrent_jobs so background workers never starve for connections
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # Recycle connections after 30 minutes
     
+    # Background Processing
+    # Keep this below the SQLAlchemy pool_size + max_overflow so workers
+    # never exhaust the connection pool.
+    max_concurrent_jobs: int = 4
+
+    # Size of the event loop's default executor (asyncio.to_thread targets)
+    thread_pool_size: int = 16
+
     # Retry Configuration
     max_retries: int = 2
     retry_backoff_multiplier: float = 2.0
     
+    # Upload Limits
+    max_upload_size: int = 100 * 1024 * 1024  # 100MB
+
     # Storage Paths
     upload_dir: str = "./uploads"
     processed_dir: str = "./processed"
     reports_dir: str = "./reports"
+
+    # On-disk cache of OCR responses keyed by page content hash
+    cache_dir: str = "./cache"
     
     # Server Configuration
     host: str = "0.0.0.0"
@@ -31,6 +51,33 @@ class Settings(BaseSettings):
     
     # CrewAI Configuration
     crewai_timeout: int = 300  # Timeout in seconds for CrewAI execution
+
+    # Maximum concurrent CrewAI executions; defaults to the CPU count
+    crew_concurrency: Optional[int] = None
+
+    # Starting concurrency for per-page OCR calls; defaults to the CPU
+    # count. The limit then adapts (AIMD) between 1 and 32 based on
+    # observed latency and rate-limit responses.
+    ocr_concurrency: Optional[int] = None
+
+    # Optional hard requests-per-minute ceiling on Vision calls, for
+    # accounts with a known RPM quota. None disables the window check.
+    ocr_rpm_limit: Optional[int] = None
+
+    # Route page OCR through the OpenAI Batch API (half the per-token
+    # cost, looser rate limits, but minutes-to-hours of turnaround).
+    # Only suitable for backfill jobs where nobody is waiting.
+    use_batch_api: bool = False
+
+    # Pages per Vision API request. 1 keeps the one-call-per-page
+    # behavior; higher values trade per-page confidence granularity for
+    # fewer HTTP round trips on multi-page PDFs.
+    ocr_batch_size: int = 1
+
+    # Commit on every pipeline stage transition for live UI visibility.
+    # When False, intermediate stages only flush and the pipeline commits
+    # at terminal states, cutting fsync round-trips per document.
+    commit_per_stage: bool = False
     
     class Config:
         env_file = ".env"
@@ -1,10 +1,21 @@
 """CrewAI orchestration and execution."""
 import asyncio
+import contextvars
+import threading
 from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
 from crewai import Crew
 from typing import List, Dict, Any, Optional
+from app.config import settings
 from app.crew.tasks import TaskFactory
-from app.crew.agents import AgentFactory
+from app.crew.agents import agent_factory
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Kickoff workers; also the stuck-worker threshold at which the pool is
+# replaced, since a pool with every worker wedged can't run anything
+_KICKOFF_WORKERS = 3
 
 
 class CrewManager:
@@ -12,9 +23,50 @@ class CrewManager:
 
     def __init__(self):
         self.task_factory = TaskFactory()
-        self.agent_factory = AgentFactory()
+        self.agent_factory = agent_factory
         # Use up to 3 workers for better concurrency
         self.executor = ThreadPoolExecutor(max_workers=3)
+        # Separate pool for kickoff calls so timeouts don't tie up the
+        # executor workers above
+        self._kickoff_pool = self._new_kickoff_pool()
+        # Workers still running a kickoff that already timed out:
+        # future.cancel() can't stop a started task, so each timeout
+        # occupies a worker until the crew returns on its own
+        self._stuck_lock = threading.Lock()
+        self._stuck_workers = 0
+
+    @staticmethod
+    def _new_kickoff_pool() -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=_KICKOFF_WORKERS, thread_name_prefix="crew-kickoff")
+
+    def _note_stuck(self, pool: ThreadPoolExecutor, future) -> None:
+        """Record a timed-out-but-still-running kickoff.
+
+        When every worker in the pool is wedged, new submissions would
+        queue behind tasks that may never return, so the pool is swapped
+        for a fresh one and the old pool is left to drain in the
+        background.
+        """
+        with self._stuck_lock:
+            if pool is not self._kickoff_pool:
+                return
+            self._stuck_workers += 1
+            if self._stuck_workers < _KICKOFF_WORKERS:
+                future.add_done_callback(lambda f: self._note_unstuck(pool))
+                return
+            logger.error(
+                f"All {_KICKOFF_WORKERS} kickoff workers are stuck on timed-out crews; "
+                "replacing the kickoff pool"
+            )
+            self._kickoff_pool = self._new_kickoff_pool()
+            self._stuck_workers = 0
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _note_unstuck(self, pool: ThreadPoolExecutor) -> None:
+        """A wedged kickoff finally returned; its worker is usable again."""
+        with self._stuck_lock:
+            if pool is self._kickoff_pool and self._stuck_workers > 0:
+                self._stuck_workers -= 1
     
     def create_crew(self, tasks: List) -> Crew:
         """Create a crew with given tasks."""
@@ -28,54 +80,29 @@ class CrewManager:
         )
     
     def _execute_crew_sync(self, crew: Crew) -> Dict[str, Any]:
-        """Execute crew synchronously (runs in thread)."""
+        """Execute crew synchronously with a timeout (runs in thread)."""
+        # Carry this thread's contextvars into the kickoff worker so the
+        # tool-level service scope set by the pipeline stays visible
+        ctx = contextvars.copy_context()
+        pool = self._kickoff_pool
+        future = pool.submit(ctx.run, crew.kickoff)
         try:
-            from app.config import settings
-            import threading
-            import queue
-            
-            result_queue = queue.Queue()
-            
-            def run_crew():
-                try:
-                    result = crew.kickoff()
-                    result_queue.put(("success", result))
-                except Exception as e:
-                    result_queue.put(("error", str(e)))
-            
-            thread = threading.Thread(target=run_crew, daemon=True)
-            thread.start()
-            thread.join(timeout=settings.crewai_timeout)
-            
-            if thread.is_alive():
-                # Thread is still running - timed out
-                return {
-                    "success": False,
-                    "result": None,
-                    "error": f"CrewAI execution timed out after {settings.crewai_timeout} seconds"
-                }
-            
-            # Get result from queue
-            try:
-                status, value = result_queue.get(timeout=1)
-                if status == "error":
-                    return {
-                        "success": False,
-                        "result": None,
-                        "error": value
-                    }
-                else:
-                    return {
-                        "success": True,
-                        "result": value,
-                        "error": None
-                    }
-            except queue.Empty:
-                return {
-                    "success": False,
-                    "result": None,
-                    "error": "CrewAI execution completed but no result available"
-                }
+            value = future.result(timeout=settings.crewai_timeout)
+            return {
+                "success": True,
+                "result": value,
+                "error": None
+            }
+        except FuturesTimeout:
+            if not future.cancel():
+                # Already running: the worker stays occupied until
+                # crew.kickoff returns on its own
+                self._note_stuck(pool, future)
+            return {
+                "success": False,
+                "result": None,
+                "error": f"CrewAI execution timed out after {settings.crewai_timeout} seconds"
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -86,8 +113,10 @@ class CrewManager:
     async def execute_crew(self, crew: Crew) -> Dict[str, Any]:
         """Execute crew asynchronously (runs in thread pool)."""
         loop = asyncio.get_event_loop()
+        ctx = contextvars.copy_context()
         result = await loop.run_in_executor(
             self.executor,
+            ctx.run,
             self._execute_crew_sync,
             crew
         )
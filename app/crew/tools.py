@@ -1,7 +1,22 @@
 """Tools for CrewAI agents to interact with OCR services."""
+import asyncio
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Dict, Any
 import json
 
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        """Serialize with orjson (C, no ascii-escaping pass)."""
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        """Stdlib fallback when orjson is not installed."""
+        return json.dumps(obj, ensure_ascii=False)
+
 # Try to import tool decorator from various possible locations
 try:
     from crewai.tools import tool
@@ -14,23 +29,59 @@ except ImportError:
             """No-op decorator when CrewAI tool is not available."""
             return func
 
-# Global service instances (will be set by pipeline)
-_ocr_extractor = None
-_summarizer = None
-_failure_logger = None
-_db_session = None
-_page_contents = None
-_progress_callback = None
-
-def set_service_instances(ocr_extractor=None, summarizer=None, failure_logger=None, db_session=None, page_contents=None, progress_callback=None):
-    """Set service instances for tools to use."""
-    global _ocr_extractor, _summarizer, _failure_logger, _db_session, _page_contents, _progress_callback
-    _ocr_extractor = ocr_extractor
-    _summarizer = summarizer
-    _failure_logger = failure_logger
-    _db_session = db_session
-    _page_contents = page_contents
-    _progress_callback = progress_callback
+# Counts words without materializing a list of substrings
+_WS_RUN = re.compile(r'\S+')
+
+# Per-context service instances, set by the pipeline for the duration of one
+# document. ContextVars isolate concurrently processing documents in the same
+# process, unlike the module globals they replace (where a later document
+# clobbered the services of one still in flight).
+_ocr_extractor_cv: ContextVar = ContextVar("ocr_extractor")
+_summarizer_cv: ContextVar = ContextVar("summarizer")
+_failure_logger_cv: ContextVar = ContextVar("failure_logger")
+_db_session_cv: ContextVar = ContextVar("db_session")
+_page_contents_cv: ContextVar = ContextVar("page_contents")
+_progress_callback_cv: ContextVar = ContextVar("progress_callback")
+# Mutable holder for the most recent extraction metadata. The tool fills it
+# in-place so the pipeline can read the dict directly instead of paying a
+# JSON round-trip through the agent transcript.
+_last_metadata_cv: ContextVar = ContextVar("last_metadata")
+
+
+@contextmanager
+def service_scope(ocr_extractor=None, summarizer=None, failure_logger=None, db_session=None, page_contents=None, progress_callback=None):
+    """Bind service instances for the tools within this context."""
+    tokens = [
+        (_ocr_extractor_cv, _ocr_extractor_cv.set(ocr_extractor)),
+        (_summarizer_cv, _summarizer_cv.set(summarizer)),
+        (_failure_logger_cv, _failure_logger_cv.set(failure_logger)),
+        (_db_session_cv, _db_session_cv.set(db_session)),
+        (_page_contents_cv, _page_contents_cv.set(page_contents)),
+        (_progress_callback_cv, _progress_callback_cv.set(progress_callback)),
+        (_last_metadata_cv, _last_metadata_cv.set({})),
+    ]
+    try:
+        yield
+    finally:
+        for cv, token in reversed(tokens):
+            cv.reset(token)
+
+
+def get_last_metadata() -> Dict[str, Any]:
+    """Return the metadata captured by the last extraction in this scope."""
+    return _last_metadata_cv.get(None) or {}
+
+
+def _record_metadata(metadata: Dict[str, Any]) -> None:
+    """Publish extraction metadata to the scope's shared holder.
+
+    Mutates the holder in place because the tool runs in a copied context;
+    a ContextVar.set there would be invisible to the pipeline.
+    """
+    holder = _last_metadata_cv.get(None)
+    if holder is not None:
+        holder.clear()
+        holder.update(metadata)
 
 
 @tool
@@ -50,12 +101,14 @@ def extract_text_from_document(document_path: str, file_type: str) -> str:
         - confidence_score: A number between 0.0 and 1.0 indicating extraction quality
         - metadata: Additional information about the extraction
     """
-    global _ocr_extractor, _page_contents, _progress_callback
+    _ocr_extractor = _ocr_extractor_cv.get(None)
+    _page_contents = _page_contents_cv.get(None)
+    _progress_callback = _progress_callback_cv.get(None)
     if not _ocr_extractor:
-        return json.dumps({"error": "OCR extractor service not available", "raw_text": "", "confidence_score": 0.0})
+        return _dumps({"error": "OCR extractor service not available", "raw_text": "", "confidence_score": 0.0})
 
     if not _page_contents:
-        return json.dumps({"error": "Page contents not available", "raw_text": "", "confidence_score": 0.0})
+        return _dumps({"error": "Page contents not available", "raw_text": "", "confidence_score": 0.0})
 
     try:
         if file_type == 'DOCX' and len(_page_contents) == 1:
@@ -66,30 +119,43 @@ def extract_text_from_document(document_path: str, file_type: str) -> str:
                 "model": "direct_extraction",
                 "file_type": file_type,
                 "text_length": len(text),
-                "word_count": len(text.split()) if text else 0
+                "word_count": sum(1 for _ in _WS_RUN.finditer(text)) if text else 0
             }
+            _record_metadata(metadata)
             result = {
                 "raw_text": text,
-                "confidence_score": float(confidence),
-                "metadata": metadata
+                "confidence_score": float(confidence)
             }
         else:
-            # Use OCR extractor for images/PDF with progress callback
-            raw_text, confidence_score, metadata = _ocr_extractor.extract_from_multiple_pages(
-                _page_contents,
-                file_type,
-                progress_callback=_progress_callback
-            )
+            # Use OCR extractor for images/PDF with progress callback.
+            # The tool runs on a kickoff worker thread with no event loop,
+            # so asyncio.run drives the page-concurrent async variant.
+            if isinstance(_page_contents, list):
+                coro = _ocr_extractor.extract_from_multiple_pages_async(
+                    _page_contents,
+                    file_type,
+                    progress_callback=_progress_callback
+                )
+            else:
+                # Lazy page source (PDF PageStream): pages render on
+                # demand and are dropped once their Vision call completes
+                coro = _ocr_extractor.extract_from_page_stream(
+                    _page_contents,
+                    file_type,
+                    progress_callback=_progress_callback,
+                    total_pages=len(_page_contents)
+                )
+            raw_text, confidence_score, metadata = asyncio.run(coro)
+            _record_metadata(metadata)
             result = {
                 "raw_text": raw_text,
-                "confidence_score": float(confidence_score),
-                "metadata": metadata
+                "confidence_score": float(confidence_score)
             }
 
-        return json.dumps(result, ensure_ascii=False)
+        return _dumps(result)
     except Exception as e:
         error_msg = str(e)
-        return json.dumps({
+        return _dumps({
             "error": error_msg,
             "raw_text": "",
             "confidence_score": 0.0,
@@ -109,7 +175,7 @@ def summarize_document_text(text: str) -> str:
     Returns:
         Summary text string
     """
-    global _summarizer
+    _summarizer = _summarizer_cv.get(None)
     if not _summarizer:
         return "Summarizer service not available"
     
@@ -139,7 +205,8 @@ def log_processing_failure(
     Returns:
         Success message
     """
-    global _failure_logger, _db_session
+    _failure_logger = _failure_logger_cv.get(None)
+    _db_session = _db_session_cv.get(None)
     if not _failure_logger or not _db_session:
         return "Failure logger or database session not available"
     
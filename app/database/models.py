@@ -1,5 +1,5 @@
 """SQLAlchemy models for OCR pipeline."""
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Index, JSON, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.db import Base
@@ -50,7 +50,7 @@ class ExtractedContent(Base):
     raw_text = Column(Text, nullable=False)
     summary = Column(Text, nullable=True)
     confidence_score = Column(Float, nullable=True)  # Overall confidence score
-    extraction_metadata = Column(Text, nullable=True)  # JSON string for additional metadata
+    extraction_metadata = Column(JSON, nullable=True)  # Native JSON: queryable via json_extract, no manual dumps/loads
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -74,4 +74,23 @@ class FailureLog(Base):
     
     # Relationships
     job = relationship("ProcessingJob", back_populates="failure_log")
+    document = relationship("Document")
+
+
+# Covering indexes for the hot query paths (history, status, failure review)
+Index("ix_job_doc_created", ProcessingJob.document_id, ProcessingJob.created_at.desc())
+Index("ix_extracted_doc", ExtractedContent.document_id)
+Index("ix_doc_upload_desc", Document.upload_date.desc())
+Index("ix_failure_reviewed_created", FailureLog.reviewed, FailureLog.created_at.desc())
+Index("ix_job_status", ProcessingJob.status)
+Index("ix_doc_status", Document.status)
+
+# Partial index for the common "pending review" dashboard query - only the
+# small unreviewed subset is indexed, so it stays tiny as resolved rows grow
+Index(
+    "ix_failure_pending_created",
+    FailureLog.created_at.desc(),
+    sqlite_where=text("reviewed = 'pending'"),
+    postgresql_where=text("reviewed = 'pending'")
+)
 
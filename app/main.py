@@ -1,10 +1,15 @@
 """FastAPI application entry point."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from pathlib import Path
 from app.api.routes import router
-from app.database.db import init_db
+from app.database.db import init_db_async
+from app.services.document_processor import shutdown_pdf_pool
 from app.utils.logger import setup_logging, get_logger
 from app.config import settings
 
@@ -12,17 +17,34 @@ from app.config import settings
 setup_logging(log_level="INFO", log_file="logs/ocr_pipeline.log")
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown: schema init and default executor sizing."""
+    logger.info("OCR Pipeline application starting up...")
+    logger.info(f"Server will run on {settings.host}:{settings.port}")
+    logger.info("Initializing database...")
+    await init_db_async()
+    logger.info("Database initialized successfully")
+    # Size the loop's default executor explicitly so asyncio.to_thread
+    # offloading isn't capped by asyncio's conservative default
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.thread_pool_size, thread_name_prefix="app-worker")
+    )
+    yield
+    logger.info("OCR Pipeline application shutting down...")
+    shutdown_pdf_pool()
+
+
 app = FastAPI(
     title="OCR Pipeline API",
     description="Document OCR pipeline with CrewAI orchestration",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,  # C-level JSON encoding for all routes
+    lifespan=lifespan
 )
 
-# Initialize database
-logger.info("Initializing database...")
-init_db()
-logger.info("Database initialized successfully")
-
 # Include API routes
 app.include_router(router)
 
@@ -37,17 +59,6 @@ if frontend_path.exists():
         return FileResponse(str(frontend_path / "index.html"))
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Application startup event."""
-    logger.info("OCR Pipeline application starting up...")
-    logger.info(f"Server will run on {settings.host}:{settings.port}")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown event."""
-    logger.info("OCR Pipeline application shutting down...")
-
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
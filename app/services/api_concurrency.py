@@ -0,0 +1,102 @@
+"""AIMD adaptive concurrency control for outbound API calls."""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ApiConcurrencyController:
+    """Bounds in-flight API calls with an AIMD-adjusted limit.
+
+    The limit grows additively on healthy responses and halves on rate
+    limits, server errors, or latency blowups, so a throttled account
+    stops burning retries while an under-utilized one ramps past the old
+    fixed ceiling. A sliding one-minute window of request timestamps
+    optionally enforces an RPM cap, and server-provided Retry-After
+    values pause new submissions entirely.
+
+    Instances are bound to the event loop that first uses them; create
+    one per extraction run.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        c_min: int = 1,
+        c_max: int = 32,
+        latency_target: float = 15.0,
+        rpm_limit: Optional[int] = None,
+    ):
+        self.c_min = c_min
+        self.c_max = c_max
+        self.latency_target = latency_target
+        self.rpm_limit = rpm_limit
+        self._limit = max(c_min, min(initial, c_max))
+        self._active = 0
+        self._cond = asyncio.Condition()
+        self._latencies: deque = deque(maxlen=20)
+        self._request_times: deque = deque()
+        self._retry_at = 0.0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one unit of concurrency for the duration of a call."""
+        await self.wait_if_throttled()
+        async with self._cond:
+            while self._active >= self._limit:
+                await self._cond.wait()
+            self._active += 1
+            if self.rpm_limit:
+                self._request_times.append(time.monotonic())
+        try:
+            yield self
+        finally:
+            async with self._cond:
+                self._active -= 1
+                # Releases re-evaluate the (possibly changed) limit
+                self._cond.notify_all()
+
+    async def wait_if_throttled(self) -> None:
+        """Sleep out any server-imposed pause and the RPM window."""
+        while True:
+            now = time.monotonic()
+            delay = self._retry_at - now
+            if delay <= 0 and self.rpm_limit:
+                window = self._request_times
+                while window and now - window[0] > 60.0:
+                    window.popleft()
+                if len(window) >= self.rpm_limit:
+                    delay = 60.0 - (now - window[0])
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def on_success(self, latency: float) -> None:
+        """Additive increase, unless latency signals saturation."""
+        self._latencies.append(latency)
+        if latency > self.latency_target:
+            self._decrease()
+        elif self._limit < self.c_max:
+            self._limit += 1
+
+    def on_error(self, status: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease on rate limits and server errors."""
+        if status is None or status == 429 or status >= 500:
+            self._decrease()
+        if retry_after:
+            self._retry_at = max(self._retry_at, time.monotonic() + retry_after)
+
+    def _decrease(self) -> None:
+        new_limit = max(self.c_min, self._limit // 2)
+        if new_limit != self._limit:
+            logger.info("API concurrency reduced from %d to %d", self._limit, new_limit)
+            self._limit = new_limit
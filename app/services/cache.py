@@ -0,0 +1,78 @@
+"""In-process read cache for hot, read-mostly Document lookups."""
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlalchemy import event
+
+from app.database.db import SessionLocal
+from app.database.models import Document
+
+
+@dataclass(frozen=True)
+class DocumentSnapshot:
+    """Detached, immutable view of a Document row.
+
+    Plain data instead of an ORM instance so cached entries never touch
+    a closed session or lazy-load anything.
+    """
+    id: int
+    filename: str
+    file_path: str
+    file_type: str
+    file_size: int
+    status: str
+    upload_date: Optional[datetime]
+
+
+# Short TTL keeps entries eventually consistent even if an invalidation
+# event is missed (e.g. a write from another process)
+_document_cache: TTLCache = TTLCache(maxsize=512, ttl=60)
+_cache_lock = threading.Lock()
+
+
+def get_document_cached(document_id: int) -> Optional[DocumentSnapshot]:
+    """Fetch a document snapshot, serving repeats from the cache.
+
+    Returns None when the document doesn't exist; misses open a
+    short-lived session and store the detached snapshot.
+    """
+    with _cache_lock:
+        snapshot = _document_cache.get(document_id)
+    if snapshot is not None:
+        return snapshot
+
+    db = SessionLocal()
+    try:
+        document = db.get(Document, document_id)
+        if document is None:
+            return None
+        snapshot = DocumentSnapshot(
+            id=document.id,
+            filename=document.filename,
+            file_path=document.file_path,
+            file_type=document.file_type,
+            file_size=document.file_size,
+            status=document.status,
+            upload_date=document.upload_date,
+        )
+    finally:
+        db.close()
+
+    with _cache_lock:
+        _document_cache[document_id] = snapshot
+    return snapshot
+
+
+def invalidate_document(document_id: int) -> None:
+    """Drop a document's cached snapshot (no-op if absent)."""
+    with _cache_lock:
+        _document_cache.pop(document_id, None)
+
+
+@event.listens_for(Document, "after_update")
+@event.listens_for(Document, "after_delete")
+def _invalidate_on_write(mapper, connection, target) -> None:
+    invalidate_document(target.id)
@@ -1,7 +1,12 @@
 """Document format detection and preprocessing."""
 import mimetypes
+import multiprocessing
+import os
+from collections import deque
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Tuple, Optional
+import numpy as np
 from PIL import Image
 from docx import Document as DocxDocument
 import io
@@ -12,6 +17,239 @@ try:
 except ImportError:
     PDFIUM_AVAILABLE = False
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_RGB
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+# One TurboJPEG handle per worker process, created lazily
+_turbo_encoder = None
+
+
+def _get_turbo_encoder():
+    global _turbo_encoder
+    if _turbo_encoder is None:
+        _turbo_encoder = TurboJPEG()
+    return _turbo_encoder
+
+
+# Extension fallback map, hoisted so it isn't rebuilt per call
+_EXT_MAP = {
+    '.png': ('PNG', 'image/png'),
+    '.jpg': ('JPEG', 'image/jpeg'),
+    '.jpeg': ('JPEG', 'image/jpeg'),
+    '.pdf': ('PDF', 'application/pdf'),
+    '.docx': ('DOCX', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    '.tiff': ('TIFF', 'image/tiff'),
+    '.tif': ('TIFF', 'image/tiff')
+}
+
+
+@lru_cache(maxsize=1024)
+def _guess_by_suffix(suffix: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Suffix-based format guess, cached per suffix.
+
+    mimetypes.guess_type lazily walks mime.types files; for these formats
+    the result is a pure function of the suffix, so it is computed once.
+    """
+    mime_type, _ = mimetypes.guess_type('f' + suffix)
+    if mime_type in DocumentProcessor.SUPPORTED_FORMATS:
+        return DocumentProcessor.SUPPORTED_FORMATS[mime_type], mime_type
+    return _EXT_MAP.get(suffix)
+
+
+def _pick_jpeg_quality(arr) -> int:
+    """Pick JPEG quality from a cheap contrast proxy.
+
+    Flat, text-dominated pages (low pixel spread) tolerate stronger
+    compression with no OCR impact, while graphics-heavy pages keep more
+    quality. Probed on an 8x-decimated view, so the classifier touches
+    ~1.5% of the pixels.
+    """
+    std = float(np.std(arr[::8, ::8]))
+    if std < 40:
+        return 75
+    if std < 80:
+        return 85
+    return 92
+
+
+# Process-lifetime pool for PDF page rendering. Spawning workers per
+# request cost a pool startup on every PDF upload; long-lived workers
+# also load pdfium once each.
+_pdf_pool = None
+
+
+def get_pdf_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _pdf_pool
+    if _pdf_pool is None:
+        ctx = multiprocessing.get_context("spawn")
+        _pdf_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1, mp_context=ctx
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """Tear down the render pool (called from app shutdown)."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+# Cap pages per PDF to bound memory use
+MAX_PAGES = 50
+
+# Max width/height in pixels for rendered pages
+MAX_RENDER_DIMENSION = 4000
+
+
+def _render_pdf_page(file_path: str, max_dimension: int, page_num: int) -> tuple:
+    """Render one PDF page to JPEG bytes (process-pool worker).
+
+    Top-level and picklable; re-opens the document by path because pdfium
+    handles cannot cross process boundaries. Returns
+    (page_num, jpeg_bytes or None, error message or None).
+    """
+    pdf = None
+    page = None
+    bitmap = None
+    pil_image = None
+    try:
+        pdf = pdfium.PdfDocument(file_path)
+        page = pdf.get_page(page_num)
+
+        # Derive the DPI from the media box so the first render already
+        # lands within max_dimension; large-format pages would otherwise
+        # be rasterized big and immediately downscaled
+        w_pt, h_pt = page.get_size()
+        longest_pt = max(w_pt, h_pt) or 1.0
+        dpi = min(150.0, max_dimension * 72.0 / longest_pt)
+
+        # Try the target DPI first (capped at 150, safer for complex
+        # graphics), falling back to 100 DPI for pages that fail
+        try:
+            bitmap = page.render(scale=dpi / 72)
+        except Exception:
+            try:
+                bitmap = page.render(scale=min(100.0, dpi) / 72)
+            except Exception as fallback_error:
+                raise Exception(f"Failed to render at both {dpi:.0f} and 100 DPI: {fallback_error}")
+
+        if TURBOJPEG_AVAILABLE:
+            # Zero-copy view over the pdfium buffer, encoded with
+            # libjpeg-turbo's SIMD paths - skips the PIL image object and
+            # its extra RGBA copy entirely
+            arr = bitmap.to_numpy()
+            height, width = arr.shape[:2]
+            if width <= max_dimension and height <= max_dimension:
+                # pdfium renders BGR(A) unless rev_byteorder was requested;
+                # tell the encoder the actual channel order or red/blue
+                # come out swapped
+                mode = getattr(bitmap, "mode", "BGR")
+                pixel_format = TJPF_RGB if "RGB" in mode else TJPF_BGR
+                jpeg = _get_turbo_encoder().encode(
+                    arr[..., :3], quality=_pick_jpeg_quality(arr), pixel_format=pixel_format
+                )
+                return page_num, jpeg, None
+            # Oversized pages still go through PIL for the high-quality
+            # LANCZOS downscale before encoding
+
+        pil_image = bitmap.to_pil()
+
+        # Clamp oversized pages to keep memory bounded
+        width, height = pil_image.size
+        if width > max_dimension or height > max_dimension:
+            if width > height:
+                new_width = max_dimension
+                new_height = int(height * (max_dimension / width))
+            else:
+                new_height = max_dimension
+                new_width = int(width * (max_dimension / height))
+            pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+        img_bytes = io.BytesIO()
+        quality = _pick_jpeg_quality(np.asarray(pil_image))
+        pil_image.save(img_bytes, format='JPEG', quality=quality, optimize=True)
+        return page_num, img_bytes.getvalue(), None
+    except Exception as e:
+        return page_num, None, str(e)
+    finally:
+        if pil_image:
+            try:
+                pil_image.close()
+            except Exception:
+                pass
+        if bitmap:
+            try:
+                del bitmap
+            except Exception:
+                pass
+        if page:
+            try:
+                page.close()
+            except Exception:
+                pass
+        if pdf:
+            try:
+                pdf.close()
+            except Exception:
+                pass
+
+
+def _iter_rendered_pages(file_path: str, page_count: int, window: int):
+    """Yield rendered page JPEGs lazily with a bounded render window.
+
+    Keeps at most `window` renders in flight on the process pool, so
+    consumers that pull pages as they go (the streaming extractor) never
+    have more than a handful of rendered pages resident at once. Failed
+    pages are logged and skipped; raises only if no page renders at all.
+    """
+    from app.utils.logger import get_logger
+    logger = get_logger(__name__)
+
+    pool = get_pdf_pool()
+    render_page = partial(_render_pdf_page, file_path, MAX_RENDER_DIMENSION)
+    pending: deque = deque()
+    next_page = 0
+    rendered = 0
+    errors = []
+    while pending or next_page < page_count:
+        while next_page < page_count and len(pending) < window:
+            pending.append(pool.submit(render_page, next_page))
+            next_page += 1
+        page_num, image_bytes, error = pending.popleft().result()
+        if error:
+            errors.append(f"Page {page_num + 1}: {error}")
+        else:
+            rendered += 1
+            yield image_bytes
+    if rendered == 0:
+        raise Exception(f"Failed to convert any PDF pages. Errors: {'; '.join(errors[:3])}")
+    if errors:
+        logger.warning(f"Successfully converted {rendered}/{page_count} pages. Some pages failed: {errors[:3]}")
+
+
+class PageStream:
+    """Re-iterable lazy page source backed by a render generator factory.
+
+    Each iteration starts a fresh render pass, so the retry handler can
+    re-run the crew without hitting an exhausted iterator, and len()
+    reports the page count without materializing anything.
+    """
+
+    def __init__(self, factory, page_count: int):
+        self._factory = factory
+        self.page_count = page_count
+
+    def __iter__(self):
+        return self._factory()
+
+    def __len__(self) -> int:
+        return self.page_count
+
 
 class DocumentProcessor:
     """Handles document format detection and preprocessing."""
@@ -25,31 +263,48 @@ class DocumentProcessor:
         'image/tiff': 'TIFF',
         'image/tif': 'TIFF'
     }
-    
-    def detect_format(self, file_path: str) -> Tuple[str, Optional[str]]:
-        """Detect document format and return (format_type, mime_type)."""
+
+    # Magic-number prefixes for the supported formats (checked before any
+    # extension/mime guessing - O(1) regardless of file size)
+    _SIGNATURES = (
+        (b'%PDF-', ('PDF', 'application/pdf')),
+        (b'\x89PNG\r\n\x1a\n', ('PNG', 'image/png')),
+        (b'\xff\xd8\xff', ('JPEG', 'image/jpeg')),
+        (b'II*\x00', ('TIFF', 'image/tiff')),
+        (b'MM\x00*', ('TIFF', 'image/tiff')),
+    )
+
+    def detect_format(self, file_path: str, header: Optional[bytes] = None) -> Tuple[str, Optional[str]]:
+        """Detect document format and return (format_type, mime_type).
+
+        Callers that already hold the first bytes of the file (e.g. the
+        streaming upload route) can pass them as `header` so detection never
+        touches the file; otherwise only the first few bytes are read.
+        """
         path = Path(file_path)
-        mime_type, _ = mimetypes.guess_type(str(path))
-        
-        if mime_type in self.SUPPORTED_FORMATS:
-            return self.SUPPORTED_FORMATS[mime_type], mime_type
-        
-        # Fallback: check extension
+
+        if header is None:
+            try:
+                with open(path, 'rb') as f:
+                    header = f.read(16)
+            except OSError:
+                header = b""
+
+        for signature, result in self._SIGNATURES:
+            if header.startswith(signature):
+                return result
+
+        # DOCX is a ZIP container - confirm via the extension
+        if header.startswith(b'PK\x03\x04') and path.suffix.lower() == '.docx':
+            return 'DOCX', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+        # Ambiguous prefix: fall back to cached suffix-based detection
         ext = path.suffix.lower()
-        ext_map = {
-            '.png': ('PNG', 'image/png'),
-            '.jpg': ('JPEG', 'image/jpeg'),
-            '.jpeg': ('JPEG', 'image/jpeg'),
-            '.pdf': ('PDF', 'application/pdf'),
-            '.docx': ('DOCX', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
-            '.tiff': ('TIFF', 'image/tiff'),
-            '.tif': ('TIFF', 'image/tiff')
-        }
-        
-        if ext in ext_map:
-            return ext_map[ext]
+        result = _guess_by_suffix(ext)
+        if result:
+            return result
         
-        raise ValueError(f"Unsupported file format: {mime_type or ext}")
+        raise ValueError(f"Unsupported file format: {ext}")
     
     def preprocess_for_ocr(self, file_path: str, file_type: str) -> list:
         """Preprocess document for OCR processing.
@@ -65,118 +320,40 @@ class DocumentProcessor:
                 return [f.read()]
         
         elif file_type == 'PDF':
-            # Convert PDF pages to images for OpenAI Vision API (parallel processing)
-            # Note: OpenAI Vision API doesn't support PDFs directly via image_url
-            # We need to convert PDF pages to images
+            # Rasterize PDF pages to images for the OpenAI Vision API
+            # (the API doesn't accept PDFs via image_url). Rendering is
+            # CPU-bound and independent per page, so it fans out across a
+            # spawn-based process pool; each worker re-opens the PDF by
+            # path since pdfium handles aren't picklable.
             if not PDFIUM_AVAILABLE:
                 raise ValueError("pypdfium2 is required for PDF processing. Install with: pip install pypdfium2")
 
             from app.utils.logger import get_logger
             logger = get_logger(__name__)
 
-            pdf = None
             try:
-                # Open PDF with error handling
                 logger.info(f"Opening PDF: {file_path}")
                 pdf = pdfium.PdfDocument(file_path)
                 page_count = len(pdf)
+                pdf.close()
                 logger.info(f"PDF has {page_count} pages")
 
                 # Limit maximum pages to prevent memory issues
-                MAX_PAGES = 50
                 if page_count > MAX_PAGES:
                     logger.warning(f"PDF has {page_count} pages, limiting to first {MAX_PAGES} pages")
                     page_count = MAX_PAGES
 
-                def convert_page_to_image(page_num):
-                    """Convert a single PDF page to image bytes with error handling."""
-                    page = None
-                    bitmap = None
-                    pil_image = None
-
-                    try:
-                        logger.debug(f"Converting page {page_num + 1}/{page_count}")
-                        page = pdf.get_page(page_num)
-
-                        # Try rendering at 150 DPI first (safer for complex graphics)
-                        # If this fails, we'll catch and skip the page
-                        try:
-                            # Use lower DPI for initial attempt (150 instead of 200)
-                            # This is safer for PDFs with complex graphics/charts
-                            bitmap = page.render(scale=150/72)  # 72 is default DPI
-                        except Exception as render_error:
-                            logger.warning(f"Page {page_num + 1}: Render at 150 DPI failed, trying 100 DPI: {render_error}")
-                            # Fallback to even lower DPI for very complex pages
-                            try:
-                                bitmap = page.render(scale=100/72)
-                            except Exception as fallback_error:
-                                raise Exception(f"Failed to render at both 150 and 100 DPI: {fallback_error}")
-
-                        # Convert bitmap to PIL image
-                        pil_image = bitmap.to_pil()
-
-                        # Limit image size to prevent memory issues
-                        # If image is too large, resize it
-                        max_dimension = 4000  # Max width or height in pixels
-                        width, height = pil_image.size
-                        if width > max_dimension or height > max_dimension:
-                            logger.info(f"Page {page_num + 1}: Resizing from {width}x{height} to fit {max_dimension}px")
-                            if width > height:
-                                new_width = max_dimension
-                                new_height = int(height * (max_dimension / width))
-                            else:
-                                new_height = max_dimension
-                                new_width = int(width * (max_dimension / height))
-                            pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-                        # Convert to bytes with optimization
-                        img_bytes = io.BytesIO()
-                        # Use JPEG for complex graphics (smaller, faster)
-                        # Quality 85 is good balance between size and OCR accuracy
-                        pil_image.save(img_bytes, format='JPEG', quality=85, optimize=True)
-
-                        logger.debug(f"Page {page_num + 1} converted successfully ({len(img_bytes.getvalue())} bytes)")
-                        return page_num, img_bytes.getvalue(), None
-
-                    except Exception as e:
-                        error_msg = f"Error converting page {page_num + 1}: {str(e)}"
-                        logger.error(error_msg)
-                        return page_num, None, error_msg
-                    finally:
-                        # Clean up resources in reverse order
-                        if pil_image:
-                            try:
-                                pil_image.close()
-                            except:
-                                pass
-                        if bitmap:
-                            try:
-                                del bitmap  # Free bitmap memory
-                            except:
-                                pass
-                        if page:
-                            try:
-                                page.close()
-                            except:
-                                pass
-
-                # Convert pages sequentially first (safer than parallel for problematic PDFs)
-                # Use sequential processing to avoid segfaults from parallel C++ library calls
-                images = [None] * page_count
-                errors = []
+                logger.info(f"Rendering {page_count} pages on the shared process pool")
+                render_page = partial(_render_pdf_page, file_path, MAX_RENDER_DIMENSION)
+                results = list(get_pdf_pool().map(render_page, range(page_count), chunksize=1))
 
-                logger.info(f"Converting {page_count} pages sequentially (safer for complex PDFs)")
-                for i in range(page_count):
-                    page_num, image_bytes, error = convert_page_to_image(i)
+                images = []
+                errors = []
+                for page_num, image_bytes, error in results:
                     if error:
                         errors.append(f"Page {page_num + 1}: {error}")
-                        # Create a placeholder for failed pages
-                        images[page_num] = None
                     else:
-                        images[page_num] = image_bytes
-
-                # Filter out None values (failed pages)
-                images = [img for img in images if img is not None]
+                        images.append(image_bytes)
 
                 if len(images) == 0:
                     raise Exception(f"Failed to convert any PDF pages. Errors: {'; '.join(errors[:3])}")
@@ -192,24 +369,50 @@ class DocumentProcessor:
                 error_msg = f"PDF processing failed: {str(e)}"
                 logger.error(error_msg)
                 raise Exception(error_msg)
-            finally:
-                # Always close the PDF to free resources
-                if pdf:
-                    try:
-                        pdf.close()
-                        logger.debug("PDF document closed")
-                    except Exception as e:
-                        logger.warning(f"Error closing PDF: {e}")
         
         elif file_type == 'DOCX':
-            # For DOCX, extract text directly (OpenAI can process text)
+            # For DOCX, extract text directly (OpenAI can process text).
+            # Generator feed to join avoids materializing a second list of
+            # every paragraph string alongside the joined result.
             doc = DocxDocument(file_path)
-            text_content = "\n".join([para.text for para in doc.paragraphs])
+            text_content = "\n".join(para.text for para in doc.paragraphs)
             return [text_content.encode('utf-8')]
         
         else:
             raise ValueError(f"Unsupported file type for preprocessing: {file_type}")
     
+    def preprocess_for_ocr_stream(self, file_path: str, file_type: str):
+        """Lazy variant of preprocess_for_ocr for PDFs.
+
+        Returns a PageStream that renders pages on demand instead of a
+        fully materialized list, bounding resident memory to the render
+        window regardless of document length. Non-PDF types fall back to
+        the eager path (single-item lists; nothing to stream).
+        """
+        if file_type != 'PDF':
+            return self.preprocess_for_ocr(file_path, file_type)
+
+        if not PDFIUM_AVAILABLE:
+            raise ValueError("pypdfium2 is required for PDF processing. Install with: pip install pypdfium2")
+
+        from app.utils.logger import get_logger
+        logger = get_logger(__name__)
+
+        pdf = pdfium.PdfDocument(file_path)
+        page_count = len(pdf)
+        pdf.close()
+        logger.info(f"PDF has {page_count} pages")
+
+        if page_count > MAX_PAGES:
+            logger.warning(f"PDF has {page_count} pages, limiting to first {MAX_PAGES} pages")
+            page_count = MAX_PAGES
+
+        window = max(2, os.cpu_count() or 1)
+        return PageStream(
+            partial(_iter_rendered_pages, file_path, page_count, window),
+            page_count,
+        )
+
     def get_file_size(self, file_path: str) -> int:
         """Get file size in bytes."""
         return Path(file_path).stat().st_size
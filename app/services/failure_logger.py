@@ -1,11 +1,25 @@
 """Failure logging service for human review."""
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from datetime import datetime
 from typing import Optional
 from app.database.models import FailureLog, ProcessingJob, Document
 from app.services.storage import storage_service
 import json
 
+try:
+    import orjson
+
+    def _dumps_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _dumps_pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+_RULE = "=" * 80
+_SUBRULE = "-" * 80
+
 
 class FailureLogger:
     """Logs failures for human review."""
@@ -21,7 +35,10 @@ class FailureLogger:
         additional_context: Optional[dict] = None
     ) -> FailureLog:
         """Log a failure for human review.
-        
+
+        Thin wrapper over log_failures_bulk so single and bulk logging
+        share one code path.
+
         Args:
             db: Database session
             job_id: Processing job ID
@@ -30,61 +47,80 @@ class FailureLogger:
             error_type: Type of error (optional)
             retry_count: Number of retries attempted
             additional_context: Additional context data
-            
+
         Returns:
             Created FailureLog instance
         """
-        # Create failure log entry
-        failure_log = FailureLog(
-            job_id=job_id,
-            document_id=document_id,
-            error_message=error_message,
-            error_type=error_type,
-            retry_count=retry_count
-        )
-        
-        db.add(failure_log)
+        ids = self.log_failures_bulk(db, [{
+            "job_id": job_id,
+            "document_id": document_id,
+            "error_message": error_message,
+            "error_type": error_type,
+            "retry_count": retry_count
+        }], additional_context=additional_context)
+        return db.get(FailureLog, ids[0])
+
+    def log_failures_bulk(
+        self,
+        db: Session,
+        failures: list[dict],
+        additional_context: Optional[dict] = None
+    ) -> list[int]:
+        """Insert many failure rows with one executemany and one commit.
+
+        Bulk reprocessing used to pay a transaction and fsync per row;
+        here the whole batch shares a single round-trip. Report files are
+        written after the commit so a slow disk never extends the
+        transaction.
+
+        Args:
+            db: Database session
+            failures: List of dicts with FailureLog column values
+            additional_context: Context appended to every report
+
+        Returns:
+            IDs of the created rows, in input order
+        """
+        if not failures:
+            return []
+
+        stmt = insert(FailureLog).returning(FailureLog.id)
+        ids = list(db.execute(stmt, failures).scalars().all())
         db.commit()
-        db.refresh(failure_log)
-        
-        # Create failure report file
-        report_content = self._generate_report(failure_log, additional_context)
-        report_path = storage_service.save_failure_report(report_content, job_id)
-        
-        return failure_log
-    
+
+        for failure_id in ids:
+            failure_log = db.get(FailureLog, failure_id)
+            report_content = self._generate_report(failure_log, additional_context)
+            storage_service.save_failure_report(report_content, failure_log.job_id)
+
+        return ids
+
     def _generate_report(self, failure_log: FailureLog, additional_context: Optional[dict] = None) -> str:
-        """Generate failure report content."""
-        report_lines = [
-            "=" * 80,
-            "OCR PIPELINE FAILURE REPORT",
-            "=" * 80,
-            "",
-            f"Failure ID: {failure_log.id}",
-            f"Job ID: {failure_log.job_id}",
-            f"Document ID: {failure_log.document_id}",
-            f"Timestamp: {failure_log.created_at}",
-            f"Retry Count: {failure_log.retry_count}",
-            "",
-            "ERROR DETAILS",
-            "-" * 80,
-            f"Error Type: {failure_log.error_type or 'Unknown'}",
-            f"Error Message: {failure_log.error_message}",
-            ""
-        ]
-        
-        if additional_context:
-            report_lines.extend([
-                "ADDITIONAL CONTEXT",
-                "-" * 80,
-                json.dumps(additional_context, indent=2),
-                ""
-            ])
-        
-        report_lines.append("=" * 80)
-        
-        return "\n".join(report_lines)
-    
+        """Generate failure report content in a single rendering pass."""
+        context_section = (
+            f"ADDITIONAL CONTEXT\n{_SUBRULE}\n{_dumps_pretty(additional_context)}\n\n"
+            if additional_context else ""
+        )
+        return (
+            f"{_RULE}\n"
+            f"OCR PIPELINE FAILURE REPORT\n"
+            f"{_RULE}\n"
+            f"\n"
+            f"Failure ID: {failure_log.id}\n"
+            f"Job ID: {failure_log.job_id}\n"
+            f"Document ID: {failure_log.document_id}\n"
+            f"Timestamp: {failure_log.created_at}\n"
+            f"Retry Count: {failure_log.retry_count}\n"
+            f"\n"
+            f"ERROR DETAILS\n"
+            f"{_SUBRULE}\n"
+            f"Error Type: {failure_log.error_type or 'Unknown'}\n"
+            f"Error Message: {failure_log.error_message}\n"
+            f"\n"
+            f"{context_section}"
+            f"{_RULE}"
+        )
+
     def get_failures(self, db: Session, reviewed: Optional[str] = None, limit: int = 100) -> list[FailureLog]:
         """Get failure logs, optionally filtered by review status.
         
@@ -96,13 +132,27 @@ class FailureLogger:
         Returns:
             List of FailureLog instances
         """
-        query = db.query(FailureLog)
-        
+        stmt = select(FailureLog).options(
+            selectinload(FailureLog.job),
+            joinedload(FailureLog.document)
+        )
         if reviewed:
-            query = query.filter(FailureLog.reviewed == reviewed)
-        
-        return query.order_by(FailureLog.created_at.desc()).limit(limit).all()
+            stmt = stmt.where(FailureLog.reviewed == reviewed)
+        stmt = stmt.order_by(FailureLog.created_at.desc()).limit(limit)
+        return list(db.execute(stmt).scalars().unique().all())
     
+    async def get_failures_async(self, db: AsyncSession, reviewed: Optional[str] = None, limit: int = 100) -> list[FailureLog]:
+        """Async variant of get_failures for request handlers."""
+        stmt = select(FailureLog).options(
+            selectinload(FailureLog.job),
+            joinedload(FailureLog.document)
+        )
+        if reviewed:
+            stmt = stmt.where(FailureLog.reviewed == reviewed)
+        stmt = stmt.order_by(FailureLog.created_at.desc()).limit(limit)
+        result = await db.execute(stmt)
+        return list(result.scalars().unique().all())
+
     def mark_reviewed(self, db: Session, failure_id: int, review_notes: Optional[str] = None) -> FailureLog:
         """Mark a failure as reviewed.
         
@@ -114,7 +164,7 @@ class FailureLogger:
         Returns:
             Updated FailureLog instance
         """
-        failure_log = db.query(FailureLog).filter(FailureLog.id == failure_id).first()
+        failure_log = db.get(FailureLog, failure_id)
         if failure_log:
             failure_log.reviewed = "reviewed"
             if review_notes:
@@ -122,4 +172,3 @@ class FailureLogger:
             db.commit()
             db.refresh(failure_log)
         return failure_log
-
@@ -1,21 +1,87 @@
 """OCR extraction using OpenAI Vision API."""
-import base64
-import concurrent.futures
+import asyncio
+import io
+import json
+import os
+import re
 import time
-from typing import List, Dict, Tuple
-from openai import OpenAI
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import diskcache
+import numpy as np
+import pybase64
+import xxhash
+
 from app.config import settings
+from app.services.api_concurrency import ApiConcurrencyController
 from app.services.confidence_scorer import ConfidenceScorer
+from app.services.openai_client import get_client, get_async_client
 from app.utils.logger import get_logger
 
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        """Serialize with orjson (C, no ascii-escaping pass)."""
+        return orjson.dumps(obj)
+
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        """Stdlib fallback when orjson is not installed."""
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def _loads(data):
+        return json.loads(data)
+
+# Counts words without materializing a list of substrings
+_WORD_RE = re.compile(r'\S+')
+
+# Magic-byte prefixes for the image formats Vision accepts
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8', 'jpeg'),
+    (b'\x89PNG', 'png'),
+    (b'GIF8', 'gif'),
+    (b'RIFF', 'webp'),
+)
+
+
+def _detect_image_format(image_content: bytes) -> str:
+    """Tag the payload's MIME subtype from its magic bytes (png default).
+
+    The memoryview slice avoids copying anything beyond the four-byte
+    header out of large page buffers.
+    """
+    head = bytes(memoryview(image_content)[:4])
+    for signature, image_format in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    return 'png'
+
 
 class OCRExtractor:
     """Extracts text from documents using OpenAI Vision API."""
-    
+
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = get_client()
         self.confidence_scorer = ConfidenceScorer()
-    
+        # Persistent OCR cache keyed by page content hash, so retries,
+        # re-runs, and shared template pages skip the Vision round trip
+        self._cache = diskcache.Cache(settings.cache_dir, size_limit=2**30)
+
+    @property
+    def aclient(self):
+        """Async client bound to the current event loop.
+
+        Resolved per call rather than cached at construction: the crew
+        tool drives extraction with a fresh asyncio.run() per document,
+        and a client pinned to the first loop would fail once that loop
+        closed.
+        """
+        return get_async_client()
+
     def extract_from_multiple_pages(self, page_contents: List[bytes], file_type: str, progress_callback=None) -> Tuple[str, float, Dict]:
         """Extract text from multiple pages/images (parallel processing).
 
@@ -28,7 +94,7 @@ class OCRExtractor:
             Tuple of (combined_text, average_confidence, metadata)
         """
         logger = get_logger(__name__)
-        
+
         # For DOCX, process synchronously (already text)
         if file_type == 'DOCX':
             docx_start = time.time()
@@ -42,118 +108,371 @@ class OCRExtractor:
                 all_confidences.append(confidence)
             docx_time = time.time() - docx_start
             logger.info(f"DOCX text extraction completed in {docx_time:.2f}s")
-        
-        # For PDFs, process as images (pages converted to images)
-        elif file_type == 'PDF':
-            logger.info(f"Processing {len(page_contents)} PDF pages as images with OpenAI Vision API")
-            # PDF pages are converted to images, process them like regular images
-
-            # Process up to 8 pages concurrently (balance between speed and API rate limits)
-            max_workers = min(len(page_contents), 8)
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all pages for processing
-                futures = {
-                    executor.submit(self._process_single_image_sync, idx, page_content, logger): idx 
-                    for idx, page_content in enumerate(page_contents)
-                }
-                
-                # Collect results as they complete
-                results = []
-                for future in concurrent.futures.as_completed(futures):
-                    idx = futures[future]
-                    try:
-                        result = future.result()
-                        results.append(result)
-                        logger.info(f"Completed PDF page {result[0] + 1}/{len(page_contents)}")
-
-                        # Call progress callback if provided
-                        if progress_callback:
-                            progress_callback(result[0] + 1, len(page_contents))
-                    except Exception as e:
-                        logger.error(f"Error processing PDF page {idx + 1}: {e}")
-                        results.append((idx, f"[Error: {str(e)}]", 0.0))
-
-                        # Still report progress even on error
-                        if progress_callback:
-                            progress_callback(idx + 1, len(page_contents))
-            
-            # Sort results by index to maintain order
-            results.sort(key=lambda x: x[0])
-            all_texts = [result[1] for result in results]
-            all_confidences = [result[2] for result in results]
-        
+
+            combined_text = "\n\n--- Page Break ---\n\n".join(all_texts)
+            avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0.0
+            metadata = {
+                "model": "gpt-4o",
+                "file_type": file_type,
+                "page_count": len(page_contents),
+                "text_length": len(combined_text),
+                "word_count": sum(1 for _ in _WORD_RE.finditer(combined_text)) if combined_text else 0,
+                "page_confidences": all_confidences,
+                "processing_method": "image_ocr"
+            }
+            return combined_text, avg_confidence, metadata
+
+        # PDF pages and images go through the async Vision fan-out; callers
+        # without a running event loop drive it here.
+        return asyncio.run(
+            self.extract_from_multiple_pages_async(page_contents, file_type, progress_callback)
+        )
+
+    async def extract_from_multiple_pages_async(self, page_contents: List[bytes], file_type: str, progress_callback=None) -> Tuple[str, float, Dict]:
+        """Async variant of extract_from_multiple_pages.
+
+        Pages fan out as coroutines awaiting AsyncOpenAI directly - no
+        worker threads holding stacks while blocked on HTTP - bounded by
+        an AIMD concurrency controller seeded from
+        settings.ocr_concurrency (CPU count by default). Page order is
+        preserved via indices.
+        """
+        logger = get_logger(__name__)
+
+        # DOCX has no OCR work; the sync path is already cheap
+        if file_type == 'DOCX':
+            return await asyncio.to_thread(
+                self.extract_from_multiple_pages, page_contents, file_type, progress_callback
+            )
+
+        if settings.use_batch_api:
+            return await asyncio.to_thread(
+                self.extract_from_multiple_pages_batch, page_contents, file_type, progress_callback
+            )
+
+        total = len(page_contents)
+        batch_size = max(1, settings.ocr_batch_size)
+        logger.info(f"Processing {total} pages concurrently with OpenAI Vision API (batch size {batch_size})")
+        controller = ApiConcurrencyController(
+            initial=settings.ocr_concurrency or os.cpu_count() or 4,
+            rpm_limit=settings.ocr_rpm_limit,
+        )
+        completed = 0
+
+        # Preallocated SoA result slots indexed by work unit: workers
+        # write straight into their slot, so no sort or unzip pass is
+        # needed afterwards
+        batches = None
+        if batch_size > 1:
+            batches = [page_contents[start:start + batch_size] for start in range(0, total, batch_size)]
+        units = len(batches) if batches is not None else total
+        all_texts: List = [None] * units
+        all_confidences = np.zeros(units, dtype=np.float32)
+
+        async def extract_page(idx: int, content: bytes) -> None:
+            nonlocal completed
+            async with controller.slot():
+                result = await self._process_single_image(idx, content, logger, controller)
+            all_texts[result[0]] = result[1]
+            all_confidences[result[0]] = result[2]
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, total)
+
+        async def extract_batch(idx: int, batch: List[bytes]) -> None:
+            nonlocal completed
+            async with controller.slot():
+                result = await self._process_image_batch(idx, batch, logger, controller)
+            all_texts[result[0]] = result[1]
+            all_confidences[result[0]] = result[2]
+            completed += len(batch)
+            if progress_callback:
+                progress_callback(min(completed, total), total)
+
+        if batches is not None:
+            await asyncio.gather(
+                *(extract_batch(idx, batch) for idx, batch in enumerate(batches))
+            )
         else:
-            # For images, process in parallel using ThreadPoolExecutor
-            logger.info(f"Processing {len(page_contents)} images in parallel with OpenAI Vision API")
-
-            # Process up to 8 images concurrently (balance between speed and API rate limits)
-            max_workers = min(len(page_contents), 8)
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all images for processing
-                futures = {
-                    executor.submit(self._process_single_image_sync, idx, page_content, logger): idx 
-                    for idx, page_content in enumerate(page_contents)
-                }
-                
-                # Collect results as they complete
-                results = []
-                for future in concurrent.futures.as_completed(futures):
-                    idx = futures[future]
-                    try:
-                        result = future.result()
-                        results.append(result)
-                        logger.info(f"Completed image {result[0] + 1}/{len(page_contents)}")
-
-                        # Call progress callback if provided
-                        if progress_callback:
-                            progress_callback(result[0] + 1, len(page_contents))
-                    except Exception as e:
-                        logger.error(f"Error processing image {idx + 1}: {e}")
-                        results.append((idx, f"[Error: {str(e)}]", 0.0))
-
-                        # Still report progress even on error
-                        if progress_callback:
-                            progress_callback(idx + 1, len(page_contents))
-            
-            # Sort results by index to maintain order
-            results.sort(key=lambda x: x[0])
-            all_texts = [result[1] for result in results]
-            all_confidences = [result[2] for result in results]
-        
-        # Combine all texts
+            await asyncio.gather(
+                *(extract_page(idx, content) for idx, content in enumerate(page_contents))
+            )
+
+        combined_text = "\n\n--- Page Break ---\n\n".join(t for t in all_texts if t is not None)
+        # Vectorized reductions over the confidence array; the
+        # distribution (not just the mean) feeds downstream quality gates
+        avg_confidence = float(all_confidences.mean()) if all_confidences.size else 0.0
+        metadata = {
+            "model": "gpt-4o",
+            "file_type": file_type,
+            "page_count": total,
+            "text_length": len(combined_text),
+            "word_count": sum(1 for _ in _WORD_RE.finditer(combined_text)) if combined_text else 0,
+            "page_confidences": all_confidences.tolist(),
+            "confidence_min": float(all_confidences.min()) if all_confidences.size else 0.0,
+            "confidence_max": float(all_confidences.max()) if all_confidences.size else 0.0,
+            "confidence_stddev": float(all_confidences.std()) if all_confidences.size else 0.0,
+            "processing_method": "pdf_to_image_ocr" if file_type == 'PDF' else "image_ocr"
+        }
+        return combined_text, avg_confidence, metadata
+
+    async def extract_from_page_stream(self, page_source: Iterable[Union[bytes, Path, str]], file_type: str, progress_callback=None, total_pages: Optional[int] = None) -> Tuple[str, float, Dict]:
+        """Extract from a lazily produced page stream.
+
+        Unlike extract_from_multiple_pages_async, which receives every
+        page's bytes up front, this pulls pages from the iterable only as
+        workers free up, so a 200-page PDF never has all its rendered
+        pages resident at once. A bounded queue (2x the concurrency
+        limit) backpressures the producer; items may be raw bytes or
+        paths read lazily in a worker thread. Page references are
+        dropped as soon as their Vision call completes.
+        """
+        if settings.use_batch_api:
+            # Batch submissions need the whole JSONL up front, so this
+            # (non-interactive) path materializes the stream
+            pages = [
+                Path(item).read_bytes() if isinstance(item, (str, Path)) else item
+                for item in page_source
+            ]
+            return await asyncio.to_thread(
+                self.extract_from_multiple_pages_batch, pages, file_type, progress_callback
+            )
+
+        logger = get_logger(__name__)
+        controller = ApiConcurrencyController(
+            initial=settings.ocr_concurrency or os.cpu_count() or 4,
+            rpm_limit=settings.ocr_rpm_limit,
+        )
+        workers = controller.c_max
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(2, controller.limit * 2))
+        results: Dict[int, Tuple[str, float]] = {}
+        completed = 0
+        iterator = iter(page_source)
+        _done = object()
+
+        async def produce() -> None:
+            idx = 0
+            while True:
+                # next() may hit disk (generator page sources); keep it
+                # off the event loop
+                content = await asyncio.to_thread(next, iterator, None)
+                if content is None:
+                    break
+                await queue.put((idx, content))
+                idx += 1
+            for _ in range(workers):
+                await queue.put(_done)
+
+        async def consume() -> None:
+            nonlocal completed
+            while True:
+                item = await queue.get()
+                if item is _done:
+                    return
+                idx, content = item
+                if isinstance(content, (str, Path)):
+                    content = await asyncio.to_thread(Path(content).read_bytes)
+                async with controller.slot():
+                    result = await self._process_single_image(idx, content, logger, controller)
+                del content
+                results[idx] = (result[1], result[2])
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, total_pages or completed)
+
+        await asyncio.gather(produce(), *(consume() for _ in range(workers)))
+
+        ordered = [results[idx] for idx in sorted(results)]
+        all_texts = [text for text, _ in ordered]
+        all_confidences = [confidence for _, confidence in ordered]
         combined_text = "\n\n--- Page Break ---\n\n".join(all_texts)
-        
-        # Calculate average confidence
         avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0.0
-        
-        # Prepare metadata
         metadata = {
             "model": "gpt-4o",
             "file_type": file_type,
-            "page_count": len(page_contents),
+            "page_count": len(ordered),
             "text_length": len(combined_text),
-            "word_count": len(combined_text.split()) if combined_text else 0,
+            "word_count": sum(1 for _ in _WORD_RE.finditer(combined_text)) if combined_text else 0,
             "page_confidences": all_confidences,
             "processing_method": "pdf_to_image_ocr" if file_type == 'PDF' else "image_ocr"
         }
-        
         return combined_text, avg_confidence, metadata
-    
-    def _process_single_image_sync(self, idx: int, image_content: bytes, logger) -> Tuple[int, str, float]:
-        """Process a single image synchronously (for thread pool executor)."""
+
+    def extract_from_multiple_pages_batch(self, page_contents: List[bytes], file_type: str, progress_callback=None) -> Tuple[str, float, Dict]:
+        """Extract pages through the OpenAI Batch API (non-interactive).
+
+        All pages go up as one JSONL submission, which costs half the
+        per-token rate and draws on separate, looser quotas - at the
+        price of minutes-to-hours of turnaround. Intended for backfill
+        jobs; enable via settings.use_batch_api.
+        """
+        logger = get_logger(__name__)
+        total = len(page_contents)
+        logger.info(f"Submitting {total} pages as one OpenAI batch job")
+
+        lines = []
+        for idx, image_content in enumerate(page_contents):
+            base64_image = pybase64.b64encode_as_string(image_content)
+            image_format = _detect_image_format(image_content)
+            lines.append(_dumps({
+                "custom_id": f"page_{idx}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": "gpt-4o",
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": "Extract all text from this image. Preserve the formatting and structure as much as possible."
+                                },
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": f"data:image/{image_format};base64,{base64_image}"
+                                    }
+                                }
+                            ]
+                        }
+                    ],
+                    "max_tokens": 4096
+                }
+            }))
+
+        batch_file = self.client.files.create(
+            file=("ocr_batch.jsonl", io.BytesIO(b"\n".join(lines))),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+
+        # Poll with capped exponential backoff until the batch settles
+        poll_delay = 5.0
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_delay)
+            poll_delay = min(poll_delay * 2, 60.0)
+            batch = self.client.batches.retrieve(batch.id)
+        if batch.status != "completed":
+            raise Exception(f"Batch OCR job {batch.id} ended with status {batch.status}")
+
+        output = self.client.files.content(batch.output_file_id)
+        all_texts = [None] * total
+        all_confidences = [0.0] * total
+        for line in output.text.splitlines():
+            if not line:
+                continue
+            record = _loads(line)
+            idx = int(record["custom_id"].rsplit("_", 1)[1])
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                text = response["body"]["choices"][0]["message"]["content"]
+                all_texts[idx] = text
+                all_confidences[idx] = self.confidence_scorer.calculate_confidence(text)
+            else:
+                error = (record.get("error") or {}).get("message", "batch request failed")
+                all_texts[idx] = f"[Error extracting text from image {idx + 1}: {error}]"
+        if progress_callback:
+            progress_callback(total, total)
+
+        combined_text = "\n\n--- Page Break ---\n\n".join(t for t in all_texts if t is not None)
+        avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0.0
+        metadata = {
+            "model": "gpt-4o",
+            "file_type": file_type,
+            "page_count": total,
+            "text_length": len(combined_text),
+            "word_count": sum(1 for _ in _WORD_RE.finditer(combined_text)) if combined_text else 0,
+            "page_confidences": all_confidences,
+            "processing_method": "batch_api"
+        }
+        return combined_text, avg_confidence, metadata
+
+    @staticmethod
+    def _report_api_error(controller, error) -> None:
+        """Feed a failed call's status and Retry-After into the controller."""
+        if controller is None:
+            return
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        retry_after = None
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            value = headers.get("retry-after")
+            if value:
+                try:
+                    retry_after = float(value)
+                except ValueError:
+                    pass
+        controller.on_error(status=status, retry_after=retry_after)
+
+    async def _process_image_batch(self, batch_idx: int, images: List[bytes], logger, controller=None) -> Tuple[int, str, float]:
+        """Process several images with one Vision request.
+
+        One HTTP round trip covers the whole batch; the reply is treated
+        as a single text chunk for those pages, so per-page confidence
+        granularity is traded for fewer network round trips.
+        """
+        try:
+            batch_start = time.time()
+            content = [{
+                "type": "text",
+                "text": "Extract all text from these images in order. Preserve the formatting and structure as much as possible. Separate the text of each image with a line containing only '--- Page Break ---'."
+            }]
+            for image_content in images:
+                base64_image = pybase64.b64encode_as_string(image_content)
+                image_format = _detect_image_format(image_content)
+                content.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/{image_format};base64,{base64_image}"
+                    }
+                })
+
+            response = await self.aclient.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": content}],
+                max_tokens=4096
+            )
+
+            text = response.choices[0].message.content
+            if controller is not None:
+                controller.on_success(time.time() - batch_start)
+            # Scoring is pure-Python regex/stats work; run it off the loop
+            # so the next API call can be issued while this page is scored
+            confidence = await asyncio.to_thread(self.confidence_scorer.calculate_confidence, text)
+            logger.info(f"Batch {batch_idx + 1} ({len(images)} images) processed in {time.time() - batch_start:.2f}s. Text length: {len(text)}")
+            return (batch_idx, text, confidence)
+        except Exception as e:
+            self._report_api_error(controller, e)
+            logger.error(f"Error processing image batch {batch_idx + 1}: {e}")
+            return (batch_idx, f"[Error extracting text from image batch {batch_idx + 1}: {str(e)}]", 0.0)
+
+    async def _process_single_image(self, idx: int, image_content: bytes, logger, controller=None) -> Tuple[int, str, float]:
+        """Process a single image against the async Vision client."""
         try:
             image_start = time.time()
+            cache_key = xxhash.xxh3_128(image_content).hexdigest()
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Image {idx + 1} served from OCR cache")
+                return (idx, cached[0], cached[1])
+
             logger.info(f"Processing image {idx + 1} with OpenAI Vision API")
-            base64_image = base64.b64encode(image_content).decode('utf-8')
 
-            # Detect image format (PNG or JPEG)
-            # JPEG starts with FFD8, PNG starts with 89504E47
-            image_format = "jpeg" if image_content[:2] == b'\xff\xd8' else "png"
+            image_format = _detect_image_format(image_content)
+
+            base64_image = pybase64.b64encode_as_string(image_content)
+            # Drop this frame's reference so streaming callers can free
+            # the raw page bytes while the API call is in flight
+            del image_content
 
             api_start = time.time()
-            response = self.client.chat.completions.create(
+            stream = await self.aclient.chat.completions.create(
                 model="gpt-4o",
                 messages=[
                     {
@@ -172,17 +491,28 @@ class OCRExtractor:
                         ]
                     }
                 ],
-                max_tokens=4096
+                max_tokens=4096,
+                stream=True
             )
 
-            text = response.choices[0].message.content
+            # Accumulate deltas as they arrive instead of waiting on the
+            # fully buffered response; join sizes the result in one pass
+            chunks = []
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+            text = ''.join(chunks)
             api_time = time.time() - api_start
-            confidence = self.confidence_scorer.calculate_confidence(text)
+            if controller is not None:
+                controller.on_success(api_time)
+            # Keep the event loop free for other pages while this one is
+            # scored (regex/stats work holds the GIL but not the loop)
+            confidence = await asyncio.to_thread(self.confidence_scorer.calculate_confidence, text)
+            self._cache.set(cache_key, (text, confidence))
             image_total = time.time() - image_start
             logger.info(f"Image {idx + 1} ({image_format.upper()}) processed in {image_total:.2f}s (API: {api_time:.2f}s). Text length: {len(text)}")
             return (idx, text, confidence)
         except Exception as e:
+            self._report_api_error(controller, e)
             logger.error(f"Error processing image {idx + 1}: {e}")
             return (idx, f"[Error extracting text from image {idx + 1}: {str(e)}]", 0.0)
-    
-
@@ -0,0 +1,58 @@
+"""Process-wide OpenAI client singletons."""
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app.config import settings
+
+# Pool sized for the AIMD controller's upper bound (32 in-flight calls)
+# with headroom; long keepalive keeps TLS sessions warm across pages so
+# only the first call per connection pays the handshake.
+_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+
+_client: Optional[OpenAI] = None
+# Async clients are cached per event loop: httpx.AsyncClient keepalive
+# connections stay bound to the loop they were opened on, so a client
+# reused across asyncio.run() calls would hand the next loop sockets
+# belonging to a closed one ("Event loop is closed" on every call).
+_aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_client() -> OpenAI:
+    """Shared sync client; every service reuses one connection pool."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=settings.openai_api_key,
+                    http_client=httpx.Client(limits=_LIMITS),
+                )
+    return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    """Async client for the running event loop.
+
+    One client (and connection pool) per loop: coroutines on the same
+    loop share warm connections, while a fresh loop gets a fresh pool
+    instead of another loop's dead keepalive sockets. Must be called
+    from within a running loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _aclients.get(loop)
+    if client is None:
+        with _lock:
+            client = _aclients.get(loop)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=settings.openai_api_key,
+                    http_client=httpx.AsyncClient(limits=_LIMITS),
+                )
+                _aclients[loop] = client
+    return client
@@ -1,17 +1,46 @@
 """Retry logic with exponential backoff."""
 import time
 import asyncio
+import random
 from typing import Callable, Any, Optional
 from app.config import settings
 
+# Client errors where retrying the identical request cannot succeed
+_NON_RETRYABLE_STATUSES = {400, 401, 403, 404}
+
 
 class RetryHandler:
-    """Handles retry logic with exponential backoff."""
-    
+    """Handles retry logic with exponential backoff.
+
+    Delays use full jitter (uniform over the exponential window) so
+    concurrent workers that fail together don't re-stampede the API in
+    lockstep, and server-provided Retry-After values take precedence
+    over the computed delay.
+    """
+
     def __init__(self, max_retries: Optional[int] = None, backoff_multiplier: Optional[float] = None):
         self.max_retries = max_retries or settings.max_retries
         self.backoff_multiplier = backoff_multiplier or settings.retry_backoff_multiplier
-    
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Whether retrying could help (not a 4xx client error)."""
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        return status not in _NON_RETRYABLE_STATUSES
+
+    def _compute_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter backoff, raised to any server-requested delay."""
+        delay = random.uniform(0, self.backoff_multiplier ** attempt)
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers is not None:
+            value = headers.get("retry-after")
+            if value:
+                try:
+                    delay = max(delay, float(value))
+                except ValueError:
+                    pass
+        return delay
+
     async def execute_with_retry(
         self,
         func: Callable,
@@ -19,37 +48,37 @@ class RetryHandler:
         **kwargs
     ) -> tuple[Any, bool, Optional[str]]:
         """Execute function with retry logic.
-        
+
         Args:
             func: Function to execute
             *args: Positional arguments for function
             **kwargs: Keyword arguments for function
-            
+
         Returns:
             Tuple of (result, success, error_message)
         """
         last_error = None
-        
+        # Introspection walks the descriptor chain; do it once, not per attempt
+        is_coro = asyncio.iscoroutinefunction(func)
+
         for attempt in range(self.max_retries + 1):
             try:
-                if asyncio.iscoroutinefunction(func):
+                if is_coro:
                     result = await func(*args, **kwargs)
                 else:
                     result = func(*args, **kwargs)
                 return result, True, None
             except Exception as e:
                 last_error = str(e)
-                
-                if attempt < self.max_retries:
-                    # Calculate backoff delay
-                    delay = (self.backoff_multiplier ** attempt)
-                    await asyncio.sleep(delay)
+
+                if attempt < self.max_retries and self._is_retryable(e):
+                    await asyncio.sleep(self._compute_delay(attempt, e))
                 else:
-                    # All retries exhausted
+                    # All retries exhausted or error is non-retryable
                     return None, False, last_error
-        
+
         return None, False, last_error
-    
+
     def execute_with_retry_sync(
         self,
         func: Callable,
@@ -57,31 +86,28 @@ class RetryHandler:
         **kwargs
     ) -> tuple[Any, bool, Optional[str]]:
         """Execute function with retry logic (synchronous version).
-        
+
         Args:
             func: Function to execute
             *args: Positional arguments for function
             **kwargs: Keyword arguments for function
-            
+
         Returns:
             Tuple of (result, success, error_message)
         """
         last_error = None
-        
+
         for attempt in range(self.max_retries + 1):
             try:
                 result = func(*args, **kwargs)
                 return result, True, None
             except Exception as e:
                 last_error = str(e)
-                
-                if attempt < self.max_retries:
-                    # Calculate backoff delay
-                    delay = (self.backoff_multiplier ** attempt)
-                    time.sleep(delay)
+
+                if attempt < self.max_retries and self._is_retryable(e):
+                    time.sleep(self._compute_delay(attempt, e))
                 else:
-                    # All retries exhausted
+                    # All retries exhausted or error is non-retryable
                     return None, False, last_error
-        
-        return None, False, last_error
 
+        return None, False, last_error
@@ -1,61 +1,48 @@
 """Document summarization using OpenAI LLM."""
+import hashlib
 import re
-from openai import OpenAI
+import threading
+import time
 from typing import Optional
+
+from cachetools import LRUCache
+
 from app.config import settings
+from app.services.openai_client import get_client
+from app.services.retry_handler import RetryHandler
 from app.utils.logger import get_logger
 
+# OCR artifact cleanup, compiled once. The \w* fence pattern also
+# matches bare ``` so one pattern covers both open and close markers.
+_CODEBLOCK_RE = re.compile(r'```\w*\s*')
+_MULTI_NEWLINE_RE = re.compile(r'\n{3,}')
 
-class Summarizer:
-    """Summarizes extracted document content using OpenAI LLM."""
-    
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
-    
-    def summarize(self, text: str, max_length: int = 4000) -> str:
-        """Generate summary of extracted text.
-        
-        Args:
-            text: Extracted text to summarize
-            max_length: Maximum length of summary in characters
-            
-        Returns:
-            Summary text
-        """
-        if not text or len(text.strip()) == 0:
-            return "No content available to summarize."
-        
-        try:
-            import time
-            summarization_start = time.time()
-            logger = get_logger(__name__)
-            logger.info(f"Starting summarization for text of length {len(text)}")
-            
-            # Token budget: gpt-4o has 128k token context window
-            # System prompt: ~200 tokens, user prompt: ~300 tokens, completion: 2000 tokens
-            # For safety, limit to 80k characters (~20k tokens) leaving room for prompt and response
-            max_text_length = 80000
-            if len(text) > max_text_length:
-                # Truncate but try to keep important parts
-                # Keep first 60k and last 20k to capture intro and conclusion
-                first_part = text[:60000]
-                last_part = text[-20000:] if len(text) > 80000 else ""
-                text = first_part + "\n\n[... middle content truncated ...]\n\n" + last_part
-                logger = get_logger(__name__)
-                logger.info(f"Text truncated from {len(text)} to fit token limits")
-            
-            # Clean OCR artifacts from text (remove code blocks, formatting markers)
-            cleaned_text = text
-            # Remove markdown code blocks
-            cleaned_text = re.sub(r'```\w*\s*', '', cleaned_text)
-            cleaned_text = re.sub(r'```\s*', '', cleaned_text)
-            # Remove excessive whitespace
-            cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
-            # Remove leading/trailing whitespace from lines
-            lines = [line.strip() for line in cleaned_text.split('\n')]
-            cleaned_text = '\n'.join(lines)
-            
-            prompt = f"""You are an expert document analyst. First, CLASSIFY the document type, then create a comprehensive, structured summary that maximizes information with impact.
+# Prompts built once at import; the user prompt is a str.format template
+# filled with the cleaned text and length budget per call.
+_SUMMARY_SYSTEM_PROMPT = """You are an expert document analyst specializing in creating comprehensive, contextual, and structured summaries. 
+                    
+Your process:
+1. FIRST: Classify the document type (Resume, Business Plan, Technical Report, etc.)
+2. THEN: Adapt your summary structure to match the document type
+3. FINALLY: Create a detailed summary that maximizes information with impact
+
+Your summaries:
+- Classify documents accurately based on content and structure
+- Adapt summary format to document type (resumes get resume-specific sections, business docs get business sections, etc.)
+- Capture all major areas with maximum information density
+- Highlight impact, achievements, and value propositions
+- Use clear, structured sections with headings for easy navigation
+- Synthesize information rather than extracting sentences
+- Focus on what matters most - impact, value, and key differentiators
+
+IMPORTANT: 
+- Always classify the document first, then structure the summary accordingly
+- Produce clean, well-formatted summaries in natural language
+- Never output raw OCR text or code blocks
+- Extract and synthesize information, don't just copy text
+- Prioritize completeness and impact over brevity"""
+
+_SUMMARY_PROMPT_TEMPLATE = """You are an expert document analyst. First, CLASSIFY the document type, then create a comprehensive, structured summary that maximizes information with impact.
 
 STEP 1: CLASSIFY the document type (e.g., Resume/CV, Business Plan, Technical Report, Research Paper, Marketing Document, Legal Document, Contract, Proposal, etc.)
 
@@ -199,45 +186,93 @@ CRITICAL REQUIREMENTS:
 - Maximize information density while maintaining clarity
 - Prioritize completeness and accuracy over brevity
 - Keep total summary under {max_length} characters, but be comprehensive"""
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # Use gpt-4o for larger context window (128k tokens) and better quality
-                messages=[
-                    {"role": "system", "content": """You are an expert document analyst specializing in creating comprehensive, contextual, and structured summaries. 
-                    
-Your process:
-1. FIRST: Classify the document type (Resume, Business Plan, Technical Report, etc.)
-2. THEN: Adapt your summary structure to match the document type
-3. FINALLY: Create a detailed summary that maximizes information with impact
 
-Your summaries:
-- Classify documents accurately based on content and structure
-- Adapt summary format to document type (resumes get resume-specific sections, business docs get business sections, etc.)
-- Capture all major areas with maximum information density
-- Highlight impact, achievements, and value propositions
-- Use clear, structured sections with headings for easy navigation
-- Synthesize information rather than extracting sentences
-- Focus on what matters most - impact, value, and key differentiators
 
-IMPORTANT: 
-- Always classify the document first, then structure the summary accordingly
-- Produce clean, well-formatted summaries in natural language
-- Never output raw OCR text or code blocks
-- Extract and synthesize information, don't just copy text
-- Prioritize completeness and impact over brevity"""},
-                    {"role": "user", "content": prompt}
+class Summarizer:
+    """Summarizes extracted document content using OpenAI LLM."""
+    
+    def __init__(self):
+        self.client = get_client()
+        self.retry_handler = RetryHandler()
+        # Dedupe re-summarizations of identical prompts (e.g. document
+        # retries) without re-paying the completion
+        self._response_cache: LRUCache = LRUCache(maxsize=64)
+        self._cache_lock = threading.Lock()
+
+    def _chat(self, system: str, user: str, max_tokens: int = 4000) -> str:
+        """Run one chat completion with retries and response caching.
+
+        Both public methods funnel through here so retry policy, model
+        choice, and caching live in one place.
+        """
+        key = hashlib.sha256(f"{max_tokens}\x00{system}\x00{user}".encode('utf-8')).hexdigest()
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        def call() -> str:
+            # gpt-4o for the 128k context window and output quality
+            response = self.client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user}
                 ],
-                max_tokens=4000,  # Increased significantly for comprehensive, structured summaries
+                max_tokens=max_tokens,
                 temperature=0.3
             )
+            return response.choices[0].message.content.strip()
+
+        result, success, error = self.retry_handler.execute_with_retry_sync(call)
+        if not success:
+            raise Exception(f"Summarization failed: {error}")
+        with self._cache_lock:
+            self._response_cache[key] = result
+        return result
+    
+    def summarize(self, text: str, max_length: int = 4000) -> str:
+        """Generate summary of extracted text.
+        
+        Args:
+            text: Extracted text to summarize
+            max_length: Maximum length of summary in characters
             
-            summary = response.choices[0].message.content.strip()
-            summarization_time = time.time() - summarization_start
-            logger.info(f"Summarization completed in {summarization_time:.2f}s")
-            return summary
-            
-        except Exception as e:
-            raise Exception(f"Summarization failed: {str(e)}")
+        Returns:
+            Summary text
+        """
+        if not text or len(text.strip()) == 0:
+            return "No content available to summarize."
+        
+        summarization_start = time.time()
+        logger = get_logger(__name__)
+        logger.info(f"Starting summarization for text of length {len(text)}")
+        
+        # Token budget: gpt-4o has 128k token context window
+        # System prompt: ~200 tokens, user prompt: ~300 tokens, completion: 2000 tokens
+        # For safety, limit to 80k characters (~20k tokens) leaving room for prompt and response
+        max_text_length = 80000
+        original_len = len(text)
+        if original_len > max_text_length:
+            # Truncate but try to keep important parts
+            # Keep first 60k and last 20k to capture intro and conclusion;
+            # the f-string builds the result in a single allocation
+            text = f"{text[:60000]}\n\n[... middle content truncated ...]\n\n{text[-20000:]}"
+            logger.info(f"Text truncated from {original_len} to {len(text)} to fit token limits")
+        
+        # Clean OCR artifacts from text (remove code blocks, formatting
+        # markers, excessive whitespace)
+        cleaned_text = _MULTI_NEWLINE_RE.sub('\n\n', _CODEBLOCK_RE.sub('', text))
+        # Remove leading/trailing whitespace from lines without
+        # materializing the intermediate list
+        cleaned_text = '\n'.join(line.strip() for line in cleaned_text.splitlines())
+        
+        prompt = _SUMMARY_PROMPT_TEMPLATE.format(cleaned_text=cleaned_text, max_length=max_length)
+        
+        summary = self._chat(_SUMMARY_SYSTEM_PROMPT, prompt, max_tokens=4000)
+        summarization_time = time.time() - summarization_start
+        logger.info(f"Summarization completed in {summarization_time:.2f}s")
+        return summary
     
     def summarize_with_context(self, text: str, context: Optional[str] = None) -> str:
         """Generate summary with additional context.
@@ -266,19 +301,9 @@ IMPORTANT:
             
             Summary:"""
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # Use gpt-4o for consistency with main summarize method
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that creates clear and concise summaries."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            raise Exception(f"Summarization failed: {str(e)}")
+        return self._chat(
+            "You are a helpful assistant that creates clear and concise summaries.",
+            prompt,
+            max_tokens=2000
+        )
 